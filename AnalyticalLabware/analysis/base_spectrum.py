@@ -12,6 +12,7 @@ from scipy import (
     signal,
     interpolate,
     integrate,
+    linalg,
 )
 
 from .utils import interpolate_to_index, find_nearest_value_index
@@ -353,12 +354,31 @@ class AbstractSpectrum(ABC):
 
         # generating the baseline first
         L = len(self.y)
-        D = sparse.csc_matrix(np.diff(np.eye(L), 2))
+        D = sparse.diags([1.0, -2.0, 1.0], [0, -1, -2], shape=(L, L - 2))
+        DDT = D.dot(D.transpose())
+
+        # W + lmbd * D * D.T is symmetric pentadiagonal, so it is stored in
+        # the banded (upper) form and solved with banded Cholesky in O(L)
+        ab = np.zeros((3, L))
+        ab[0, 2:] = lmbd * DDT.diagonal(2)
+        ab[1, 1:] = lmbd * DDT.diagonal(1)
+        smoothness = lmbd * DDT.diagonal(0)
+
+        # weights are float64, so the solve is done in double precision even
+        # for float32 spectra
         w = np.ones(L)
         for _ in range(n_iter):
-            W = sparse.spdiags(w, 0, L, L)
-            Z = W + lmbd * D.dot(D.transpose())
-            z = sparse.linalg.spsolve(Z, w * self.y)
+            ab[2] = smoothness + w
+            try:
+                z = linalg.solveh_banded(ab, w * self.y, check_finite=False)
+            except linalg.LinAlgError:
+                # all weights vanish when the baseline fits the trace exactly
+                # (e.g. flat/zero trace), the system is singular then and only
+                # the general sparse solver handles it
+                z = sparse.linalg.spsolve(
+                    sparse.diags(w, format="csc") + lmbd * DDT.tocsc(),
+                    w * self.y,
+                )
             w = p * (self.y > z) + (1 - p) * (self.y < z)
 
         # updating attribute for future use
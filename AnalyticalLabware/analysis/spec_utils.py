@@ -9,30 +9,33 @@ import scipy
 from .utils import find_nearest_value_index
 
 
-def create_binary_peak_map(data):
+def create_binary_peak_map(data, copy=True):
     """Return binary map of the peaks within data points.
 
     True values are assigned to potential peak points, False - to baseline.
 
     Args:
         data (:obj:np.array): 1D array with data points.
+        copy (bool, optional): If False, peak points are zeroed in the
+            supplied array, use only for temporary arrays. Default: True.
 
     Returns:
         :obj:np.array, dtype=bool: Mapping of data points, where True is
             potential peak region point, False - baseline.
     """
     # copying array
-    data_c = np.copy(data)
+    data_c = np.copy(data) if copy else data
 
     # placeholder for the peak mapping
     peak_map = np.full_like(data_c, False, dtype=bool)
 
     for _ in range(100500):  # shouldn't take more iterations
 
-        # looking for peaks
+        # looking for peaks, statistics computed once per iteration
+        mean = np.mean(data_c)
+        threshold = np.std(data_c) * 3
         peaks_found = np.logical_or(
-            data_c > np.mean(data_c) + np.std(data_c) * 3,
-            data_c < np.mean(data_c) - np.std(data_c) * 3,
+            data_c > mean + threshold, data_c < mean - threshold
         )
 
         # merging with peak mapping
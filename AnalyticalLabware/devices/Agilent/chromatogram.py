@@ -4,6 +4,8 @@ import os
 import logging
 import time
 
+from collections import OrderedDict
+
 import numpy as np
 
 from .chemstation import CHFile
@@ -42,17 +44,22 @@ class AgilentHPLCChromatogram(AbstractSpectrum):
         "timestamp",
     }
 
+    # number of most recently loaded channels kept in memory
+    CACHE_SIZE = len(CHANNELS)
+
     def __init__(self, path=None, autosaving=False):
 
-        if path is not None:
-            os.makedirs(path, exist_ok=True)
-            self.path = path
-        else:
-            self.path = os.path.join(".", "hplc_data")
-            os.makedirs(self.path, exist_ok=True)
+        # folder is created by the parent class
+        if path is None:
+            path = os.path.join(".", "hplc_data")
 
         self.logger = logging.getLogger("AgilentHPLCChromatogram")
 
+        # recently loaded raw data as
+        # {(data_path, channel): (mtime, x, y, timestamp)}
+        # kept when the instance is re-initialized by _dump()
+        self._cache = getattr(self, "_cache", OrderedDict())
+
         super().__init__(path=path, autosaving=autosaving)
 
     def load_spectrum(self, data_path, channel="A"):
@@ -68,15 +75,33 @@ class AgilentHPLCChromatogram(AbstractSpectrum):
                 self.save_data(filename=f"{data_path}_{channel}")
                 self._dump()
 
-        # get raw data
-        x, y = self.extract_rawdata(data_path, channel)
+        # raw data is reused unless the channel file was modified since
+        try:
+            mtime = os.path.getmtime(os.path.join(data_path, f"DAD1{channel}.ch"))
+        except OSError:
+            mtime = None
+
+        key = (data_path, channel)
+        cached = self._cache.get(key)
+        if mtime is not None and cached is not None and cached[0] == mtime:
+            self._cache.move_to_end(key)
+            _, x, y, timestamp = cached
+        else:
+            # get raw data
+            x, y = self.extract_rawdata(data_path, channel)
+
+            # get timestamp
+            tstr = data_path.rpartition("_")[2].partition(".")[0]
+            timestamp = time.mktime(time.strptime(tstr, TIME_FORMAT))
 
-        # get timestamp
-        tstr = data_path.split(".")[0].split("_")[-1]
-        timestamp = time.mktime(time.strptime(tstr, TIME_FORMAT))
+            if mtime is not None:
+                self._cache[key] = (mtime, x, y, timestamp)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
 
-        # loading all data
-        super().load_spectrum(x, y, timestamp)
+        # loading copies, as processing modifies the data in place
+        super().load_spectrum(x.copy(), y.copy(), timestamp)
 
     ### PUBLIC METHODS TO LOAD RAW DATA ###
 
@@ -88,21 +113,30 @@ class AgilentHPLCChromatogram(AbstractSpectrum):
             experiment_dir: .D directory with the .CH files
 
         Returns:
-            np.array(times), np.array(values)   Raw chromatogram data
+            np.asarray(times), np.asarray(values)   Raw chromatogram data, values
+                are stored as float32, which is well above the DAD resolution
         """
         filename = os.path.join(experiment_dir, f"DAD1{channel}")
         npz_file = filename + ".npz"
+        ch_file = filename + ".ch"
+
+        # NPZ is only reused if the .CH file was not modified since
+        try:
+            npz_fresh = os.path.getmtime(npz_file) >= os.path.getmtime(ch_file)
+        except FileNotFoundError:
+            npz_fresh = os.path.exists(npz_file)
 
-        if os.path.exists(npz_file):
+        if npz_fresh:
             # already processed
             data = np.load(npz_file)
-            return data["times"], data["values"]
+            # files cached before float32 storage may hold float64 values
+            return data["times"], np.asarray(data["values"], dtype=np.float32)
         else:
-            self.logger.debug("NPZ file not found. First time loading data.")
-            ch_file = filename + ".ch"
+            self.logger.debug("NPZ file not found or outdated, loading raw data.")
             data = CHFile(ch_file)
-            np.savez_compressed(npz_file, times=data.times, values=data.values)
-            return np.array(data.times), np.array(data.values)
+            values = np.asarray(data.values, dtype=np.float32)
+            np.savez_compressed(npz_file, times=data.times, values=values)
+            return np.asarray(data.times), values
 
     def extract_peakarea(self, experiment_dir: str):
         """
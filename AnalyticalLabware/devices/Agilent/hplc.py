@@ -10,15 +10,45 @@ been processed.
 .. moduleauthor:: Alexander Hammer, Hessam Mehr
 """
 
+import asyncio
+import codecs
+import functools
+import inspect
 import time
 import os
 import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+# change notifications for the reply file
+try:
+    # Windows
+    import win32con
+    import win32event
+    import win32file
+except ImportError:
+    win32file = None
+
+try:
+    # Linux
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
 
 from .chromatogram import AgilentHPLCChromatogram, TIME_FORMAT
 
 # maximum command number
 MAX_CMD_NO = 255
 
+# number of bytes read from the reply file to parse the command number,
+# enough for the BOM and "<cmd_no> ACK" in UTF-16
+REPLY_HEADER_SIZE = 32
+
+# number of bytes decoded from the end of the reply to find the DONE line
+REPLY_TAIL_SIZE = 64
+
 # Default Chemstation data directory
 DEFAULT_DATA_DIR = "C:\\Chem32\\1\\Data"
 
@@ -29,7 +59,6 @@ DEFAULT_METHOD_DIR = ""
 # See https://www.agilent.com/cs/library/usermanuals/Public/MACROS.PDF
 RESET_COUNTER_CMD = "last_cmd_no = 0"
 GET_STATUS_CMD = "response$ = AcqStatus$"
-SLEEP_CMD = "Sleep {seconds}"
 STANDBY_CMD = "Standby"
 STOP_MACRO_CMD = "Stop"
 PREPRUN_CMD = "PrepRun"
@@ -38,11 +67,138 @@ LAMP_OFF_CMD = "LampAll OFF"
 PUMP_ON_CMD = "PumpAll ON"
 PUMP_OFF_CMD = "PumpAll OFF"
 GET_METHOD_CMD = "response$ = _MethFile$"
-SWITCH_METHOD_CMD = 'LoadMethod "{method_dir}", "{method_name}.M"'
 START_METHOD_CMD = "StartMethod"
-RUN_METHOD_CMD = 'RunMethod "{data_dir}",,"{experiment_name}_{timestamp}"'
 STOP_METHOD_CMD = "StopMethod"
 
+# Deprecated: commands are now built with f-strings in the corresponding
+# methods. Templates are kept for backward compatibility only.
+SLEEP_CMD = "Sleep {seconds}"
+SWITCH_METHOD_CMD = 'LoadMethod "{method_dir}", "{method_name}.M"'
+RUN_METHOD_CMD = 'RunMethod "{data_dir}",,"{experiment_name}_{timestamp}"'
+
+
+def _parse_reply_no(raw_head: bytes) -> int:
+    """
+    Returns the command number at the start of the reply.
+
+    The digits are read directly from the UTF-16 bytes, so the header is not
+    decoded unless it is malformed.
+
+    Raises:
+        ValueError: Reply does not start with a command number.
+    """
+    # low (ASCII) and high bytes of each code unit, little-endian by default
+    if raw_head.startswith(codecs.BOM_UTF16_BE):
+        low, high = raw_head[3::2], raw_head[2::2]
+    elif raw_head.startswith(codecs.BOM_UTF16_LE):
+        low, high = raw_head[2::2], raw_head[3::2]
+    else:
+        low, high = raw_head[0::2], raw_head[1::2]
+
+    size = len(high)
+    start = 0
+    while start < size and not high[start] and low[start] in b" \t\r\n":
+        start += 1
+    end = start
+    while end < size and not high[end] and 0x30 <= low[end] <= 0x39:
+        end += 1
+    if end == start:
+        head = raw_head.decode("utf_16", errors="ignore")
+        first_line = head.partition("\n")[0]
+        raise ValueError(f"Malformed response {first_line!r}")
+    return int(low[start:end])
+
+
+class Reply:
+    """
+    Reply of the macro as read from the reply file.
+
+    The raw UTF-16 bytes are only decoded as a whole when text is accessed.
+    """
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+
+    @functools.cached_property
+    def text(self) -> str:
+        return self.raw.decode("utf_16")
+
+    def __str__(self):
+        return self.text
+
+    def is_done(self) -> bool:
+        """
+        Returns True if the reply ends with the DONE line, i.e. the command
+        has been executed. Only the end of the reply is decoded.
+        """
+        if self.raw.startswith(codecs.BOM_UTF16_BE):
+            encoding = "utf_16_be"
+        else:
+            encoding = "utf_16_le"
+        # whole code units only, the file may be read while being written
+        end = len(self.raw) & ~1
+        tail = self.raw[max(end - REPLY_TAIL_SIZE, 0) : end]
+        return tail.decode(encoding, errors="ignore").rstrip().endswith("DONE")
+
+
+class _ReplyWatcher:
+    """
+    Waits for changes in the communication directory.
+
+    Uses Win32 change notifications (pywin32) or inotify (inotify_simple) if
+    available, so that waiting returns as soon as the macro writes the reply.
+    Otherwise, waiting is a plain sleep for the given timeout.
+    """
+
+    def __init__(self, comm_dir: str, logger: logging.Logger):
+        self._handle = None
+        self._inotify = None
+        try:
+            if win32file is not None:
+                self._handle = win32file.FindFirstChangeNotification(
+                    comm_dir,
+                    False,
+                    win32con.FILE_NOTIFY_CHANGE_LAST_WRITE
+                    | win32con.FILE_NOTIFY_CHANGE_SIZE,
+                )
+            elif inotify_simple is not None:
+                self._inotify = inotify_simple.INotify()
+                self._inotify.add_watch(
+                    comm_dir,
+                    inotify_simple.flags.MODIFY | inotify_simple.flags.CLOSE_WRITE,
+                )
+        # pywin32 errors are not OSError
+        except Exception as e:
+            logger.warning("Change notifications unavailable (%s), polling.", e)
+            self.close()
+
+    def wait(self, timeout: float):
+        """
+        Blocks until the directory is changed or the timeout (s) expires.
+        Changes made since the previous call return immediately.
+        """
+        if self._handle is not None:
+            result = win32event.WaitForSingleObject(self._handle, int(timeout * 1000))
+            if result == win32event.WAIT_OBJECT_0:
+                # re-arm for the next change
+                win32file.FindNextChangeNotification(self._handle)
+        elif self._inotify is not None:
+            # drains the pending events
+            self._inotify.read(timeout=int(timeout * 1000))
+        else:
+            time.sleep(timeout)
+
+    def close(self):
+        """
+        Releases the notification handle.
+        """
+        if self._handle is not None:
+            win32file.FindCloseChangeNotification(self._handle)
+            self._handle = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
 
 class HPLCController:
     """
@@ -56,6 +212,11 @@ class HPLCController:
         cmd_file: str = "cmd",
         reply_file: str = "reply",
         logger=None,
+        initial_delay: float = 0.005,
+        max_delay: float = 0.5,
+        timeout: float = 100.0,
+        status_ttl: float = 0.2,
+        pipelined: bool = False,
     ):
         """
         Initialize HPLC controller.
@@ -64,6 +225,16 @@ class HPLCController:
                     If None, data will be saved in default folder Chem32\\1\\Data
         cmd_file: name of command file
         reply_file: name of reply file
+        initial_delay: first interval (s) when polling the reply file
+        max_delay: upper bound (s) for the polling interval, which is doubled
+                    after each unsuccessful attempt
+        timeout: time (s) to wait for a reply before giving up
+        status_ttl: time (s) for which the last status is reused instead of
+                    querying the device again
+        pipelined: if True, send() returns immediately and commands are
+                    written in the background, each one as soon as the
+                    previous one is acknowledged. Use flush() to wait for
+                    all of them
         The macro must be loaded in the Chemstation software.
         dir and filenames must match those specified in the Macro.
         """
@@ -71,6 +242,21 @@ class HPLCController:
         self.reply_file = os.path.join(comm_dir, reply_file)
         self.cmd_no = 0
 
+        # polling of the reply file
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+
+        # last parsed status and the time it was received
+        self.status_ttl = status_ttl
+        self._status_cache = (None, 0.0)
+
+        # last command sent, whose acknowledgement has not been seen yet
+        self._unacked_cmd_no = None
+
+        # serializes access to the command and reply files
+        self._lock = threading.RLock()
+
         if data_dir is None:
             if os.path.isdir(DEFAULT_DATA_DIR):
                 self.data_dir = DEFAULT_DATA_DIR
@@ -90,9 +276,18 @@ class HPLCController:
 
         self.data_files = []
 
+        # loads the channels in parallel and runs batches sent asynchronously,
+        # shut down by close()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.spectra))
+
         # Create files if needed
-        open(self.cmd_file, "a").close()
-        open(self.reply_file, "a").close()
+        Path(self.cmd_file).touch(exist_ok=True)
+        Path(self.reply_file).touch(exist_ok=True)
+
+        # kept open, so that sending is a single unbuffered write
+        self._cmd_fh = open(self.cmd_file, "r+b", buffering=0)
+        # kept open for polling, unbuffered so that every read hits the file
+        self._reply_fh = open(self.reply_file, "rb", buffering=0)
 
         if logger:
             self.logger = logger
@@ -100,107 +295,388 @@ class HPLCController:
             self.logger = logging.getLogger("hplc_logger")
             self.logger.addHandler(logging.NullHandler())
 
+        self._watcher = _ReplyWatcher(comm_dir, self.logger)
+
         self.reset_cmd_counter()
 
+        # commands waiting to be written in pipelined mode
+        self._pipeline = None
+        self._pipeline_error = None
+        if pipelined:
+            self._pipeline = queue.Queue()
+            self._pipeline_thread = threading.Thread(
+                target=self._pipeline_worker, daemon=True
+            )
+            self._pipeline_thread.start()
+
         self.logger.info("HPLC Controller initialized.")
 
-    def _send(self, cmd: str, cmd_no: int, num_attempts=5):
+    def _send(self, cmd: str, cmd_no: int, timeout: float = 5.0):
         """
         Low-level execution primitive. Sends a command string to HPLC.
 
+        If the command file is locked (e.g. being read by the macro), writing
+        is retried with the same backoff as used for polling the reply file.
+
         Args:
             cmd: Command string to be sent
             cmd_no: Command number
+            timeout: Time (s) to keep retrying to write the command file
 
         Raises:
             IOError: Could not write to command file.
         """
         err = None
-        for _ in range(num_attempts):
-            time.sleep(1)
+        payload = f"{cmd_no} {cmd}".encode("utf8")
+        deadline = time.monotonic() + timeout
+        delay = self.initial_delay
+        while True:
             try:
-                with open(self.cmd_file, "w", encoding="utf8") as cmd_file:
-                    cmd_file.write(f"{cmd_no} {cmd}")
+                self._cmd_fh.seek(0)
+                self._cmd_fh.truncate()
+                self._cmd_fh.write(payload)
             except IOError as e:
                 err = e
                 self.logger.warning("Failed to send command; trying again.")
-                continue
+                # file locked by the macro is retried as is
+                if not isinstance(e, PermissionError):
+                    self._reopen_file("_cmd_fh", self.cmd_file, "r+b")
             else:
                 self.logger.info("Sent command #%d: %s.", cmd_no, cmd)
+                self._unacked_cmd_no = cmd_no
                 return
-        else:
-            raise IOError(f"Failed to send command #{cmd_no}: {cmd}.") from err
 
-    def _receive(self, cmd_no: int, num_attempts=100) -> str:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IOError(f"Failed to send command #{cmd_no}: {cmd}.") from err
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.max_delay)
+
+    def _receive(self, cmd_no: int, timeout: float = None, wait_done=True) -> Reply:
         """
         Low-level execution primitive.
 
+        Polls the reply file with an exponentially growing interval, starting
+        from initial_delay and capped at max_delay. If change notifications
+        are available, polling is resumed as soon as the reply file changes.
+
         Args:
             cmd_no: Command number
-            num_retries: Number of retries to open reply file
+            timeout: Time (s) to wait for the reply, defaults to self.timeout
+            wait_done: If True, waits until the command is executed, otherwise
+                returns as soon as the command is acknowledged
+
+        Returns:
+            Reply to the command, decoded on first access of its text
 
         Raises:
-            IOError: Could not read reply file.
+            TimeoutError: No reply within the timeout, a subclass of IOError.
         """
+        if timeout is None:
+            timeout = self.timeout
+        deadline = time.monotonic() + timeout
+        delay = self.initial_delay
         err = None
-        for _ in range(num_attempts):
-            time.sleep(1)
-
+        while True:
+            response_no = response = None
             try:
-                with open(self.reply_file, "r", encoding="utf_16") as reply_file:
-                    response = reply_file.read()
+                # the macro may have replaced the file, kept handle is stale
+                if self._is_replaced(self._reply_fh, self.reply_file):
+                    self._reopen_file("_reply_fh", self.reply_file, "rb")
+                # only the header is needed to identify the reply
+                self._reply_fh.seek(0)
+                raw_head = self._reply_fh.read(REPLY_HEADER_SIZE)
+                try:
+                    response_no = _parse_reply_no(raw_head)
+                except ValueError as e:
+                    # also seen while the macro is rewriting the file
+                    err = e
+                    self.logger.debug("%s.", e)
+
+                # full reply is read only for the matching command, reusing
+                # the header bytes already read
+                if response_no == cmd_no:
+                    response = Reply(raw_head + self._reply_fh.read())
             except OSError as e:
                 err = e
-                self.logger.warning("Failed to read from reply file; trying again.")
-                continue
-
-            try:
-                first_line = response.splitlines()[0]
-                response_no = int(first_line.split()[0])
-            except IndexError as e:
-                err = e
-                self.logger.warning("Malformed response %s; trying again.", response)
-                continue
+                self.logger.debug("Failed to read from reply file: %s.", e)
+                self._reopen_file("_reply_fh", self.reply_file, "rb")
 
             # check that response corresponds to sent command
-            if response_no == cmd_no:
-                self.logger.info("Reply: \n%s", response)
-                return response
-            else:
-                self.logger.warning(
-                    "Response #: %d != command #: %d; trying again.",
-                    response_no,
-                    cmd_no,
+            if response is not None:
+                if self._unacked_cmd_no == cmd_no:
+                    self._unacked_cmd_no = None
+                if not wait_done or response.is_done():
+                    self.logger.info("Reply: \n%s", response)
+                    return response
+            elif response_no is not None:
+                self.logger.debug(
+                    "Response #: %d != command #: %d.", response_no, cmd_no
                 )
-                continue
-        else:
-            raise IOError(f"Failed to receive reply to command #{cmd_no}.") from err
+
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Failed to receive reply to command #{cmd_no}."
+                ) from err
+            self._watcher.wait(delay)
+            delay = min(delay * 2, self.max_delay)
 
     def send(self, cmd: str):
         """
         Sends a command to Chemstation.
 
+        In pipelined mode, the command is queued and written in the
+        background.
+
         Args:
             cmd: Command to be sent
         """
+        if self._pipeline is not None:
+            # cached status is outdated once the command is executed
+            if cmd != GET_STATUS_CMD:
+                self._status_cache = (None, 0.0)
+            self._pipeline.put(cmd)
+            return
+
+        with self._lock:
+            self._send_next(cmd)
+
+    def _send_next(self, cmd: str):
+        """
+        Sends a command with the next command number.
+
+        Args:
+            cmd: Command to be sent
+        """
+        # the macro only keeps the latest command, so the previous one must
+        # be picked up before it is overwritten
+        if self._unacked_cmd_no is not None:
+            self._receive(self._unacked_cmd_no, wait_done=False)
+
+        # any other command may change the device status
+        if cmd != GET_STATUS_CMD:
+            self._status_cache = (None, 0.0)
+
         if self.cmd_no == MAX_CMD_NO:
             self.reset_cmd_counter()
 
         self.cmd_no += 1
         self._send(cmd, self.cmd_no)
 
+    def send_batch(self, cmds) -> str:
+        """
+        Sends several commands to Chemstation as a single macro statement
+        line and waits until all of them are executed.
+
+        Args:
+            cmds: Commands to be sent, executed in the given order
+
+        Returns:
+            Reply to the batch
+        """
+        return self.send_recv("; ".join(cmds))
+
+    def send_batch_async(self, cmds) -> Future:
+        """
+        Same as send_batch, but returns immediately.
+
+        Args:
+            cmds: Commands to be sent, executed in the given order
+
+        Returns:
+            Future resolving to the reply to the batch
+        """
+        return self._submit(self.send_batch, cmds)
+
+    def _submit(self, fn, *args, **kwargs) -> Future:
+        """
+        Runs a call on the background executor.
+
+        Raises:
+            RuntimeError: The controller is closed.
+        """
+        try:
+            return self._executor.submit(fn, *args, **kwargs)
+        except RuntimeError:
+            raise RuntimeError("HPLC controller is closed.") from None
+
+    def send_recv(self, cmd: str) -> str:
+        """
+        Sends a command to Chemstation and waits for the reply.
+
+        Args:
+            cmd: Command to be sent
+
+        Returns:
+            Reply to the command
+        """
+        self.flush()
+        with self._lock:
+            self._send_next(cmd)
+            return self._receive(self.cmd_no).text
+
     def receive(self) -> str:
         """
         Returns messages received in reply file.
         """
-        return self._receive(self.cmd_no)
+        self.flush()
+        with self._lock:
+            return self._receive(self.cmd_no).text
+
+    def _pipeline_worker(self):
+        """
+        Writes the queued commands in pipelined mode.
+        """
+        while True:
+            cmd = self._pipeline.get()
+            try:
+                if cmd is None:
+                    return
+                with self._lock:
+                    self._send_next(cmd)
+            except Exception as e:
+                self.logger.error("Failed to send queued command %s: %s", cmd, e)
+                self._pipeline_error = e
+            finally:
+                self._pipeline.task_done()
+
+    def flush(self):
+        """
+        Waits until all commands sent so far are acknowledged by the macro.
+
+        Raises:
+            IOError: A queued command could not be sent or acknowledged.
+        """
+        if self._pipeline is not None:
+            self._pipeline.join()
+
+        with self._lock:
+            if self._unacked_cmd_no is not None:
+                self._receive(self._unacked_cmd_no, wait_done=False)
+
+        err, self._pipeline_error = self._pipeline_error, None
+        if err is not None:
+            raise err
+
+    def _reopen_file(self, attr: str, path: str, mode: str):
+        """
+        Reopens a kept file handle, e.g. if the file was replaced by the macro.
+
+        Args:
+            attr: Name of the attribute holding the handle
+            path: Path to the file
+            mode: Mode to open the file with
+        """
+        try:
+            fh = open(path, mode, buffering=0)
+        except OSError as e:
+            # old handle is kept, so this is retried on the next failed access
+            self.logger.debug("Failed to reopen %s: %s.", path, e)
+        else:
+            getattr(self, attr).close()
+            setattr(self, attr, fh)
+
+    @staticmethod
+    def _is_replaced(fh, path: str) -> bool:
+        """
+        Checks whether the file at the path is no longer the open file.
+
+        Args:
+            fh: Kept file handle
+            path: Path the file was opened from
+        """
+        opened = os.fstat(fh.fileno())
+        current = os.stat(path)
+        return (opened.st_ino, opened.st_size) != (current.st_ino, current.st_size)
+
+    def close(self):
+        """
+        Releases the command and reply files and the reply file watcher.
+        Background tasks already submitted are waited for. Safe to call more
+        than once, also called when leaving the `with` block.
+        """
+        pipeline = getattr(self, "_pipeline", None)
+        if pipeline is not None:
+            pipeline.put(None)
+            self._pipeline_thread.join()
+            self._pipeline = None
+
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            # queued batches still need the command file
+            executor.shutdown(wait=True)
+
+        self._close_files()
+
+    def _close_files(self):
+        """
+        Releases the command and reply files and the reply file watcher.
+        """
+        # attributes may be missing if __init__ failed
+        for attr in ("_cmd_fh", "_reply_fh", "_watcher"):
+            handle = getattr(self, attr, None)
+            if handle is not None:
+                handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        # threads must not be joined from a finalizer, use close() for them
+        self._close_files()
+
+    def _last_sent_cmd_no(self):
+        """
+        Returns the command number currently in the command file, or None if
+        it cannot be read.
+        """
+        try:
+            self._cmd_fh.seek(0)
+            raw = self._cmd_fh.read(64)
+        except OSError:
+            return None
+
+        # the macro writes the file in UTF-16 when it is started
+        if raw[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+            text = raw.decode("utf_16", errors="ignore")
+        else:
+            text = raw.decode("utf8", errors="ignore")
+
+        try:
+            return int(text.split(maxsplit=1)[0])
+        except (IndexError, ValueError):
+            return None
+
+    def _macro_counter_is_reset(self) -> bool:
+        """
+        Checks whether the macro counter is at 0 already, i.e. the macro has
+        just been started or the last command executed was a reset.
+        """
+        last_sent = self._last_sent_cmd_no()
+        if last_sent == 0:
+            return True
+        if last_sent == MAX_CMD_NO + 1:
+            try:
+                self._receive(cmd_no=MAX_CMD_NO + 1, timeout=0)
+            except IOError:
+                return False
+            return True
+        return False
 
     def reset_cmd_counter(self):
         """
         Resets the command counter.
+
+        The round trip to the macro is skipped if its counter is at 0 already.
         """
-        self._send(RESET_COUNTER_CMD, cmd_no=MAX_CMD_NO + 1)
-        self._receive(cmd_no=MAX_CMD_NO + 1)
+        if self._macro_counter_is_reset():
+            self.logger.debug("Command counter already reset")
+        else:
+            self._send(RESET_COUNTER_CMD, cmd_no=MAX_CMD_NO + 1)
+            self._receive(cmd_no=MAX_CMD_NO + 1)
         self.cmd_no = 0
 
         self.logger.debug("Reset command counter")
@@ -212,7 +688,7 @@ class HPLCController:
         Args:
             seconds: number of seconds to wait
         """
-        self.send(SLEEP_CMD.format(seconds=seconds))
+        self.send(f"Sleep {seconds}")
         self.logger.debug("Sleep command sent.")
 
     def standby(self):
@@ -249,17 +725,24 @@ class HPLCController:
         BREAK           Injection paused
         NORESPONSE
         MALFORMED
+
+        Status received within the last status_ttl seconds is reused.
         """
-        self.send(GET_STATUS_CMD)
-        time.sleep(1)
+        parsed_response, received = self._status_cache
+        if parsed_response is not None:
+            if time.monotonic() - received < self.status_ttl:
+                return list(parsed_response)
 
         try:
-            parsed_response = self.receive().splitlines()[1].split()[1:]
+            response = self.send_recv(GET_STATUS_CMD)
+            parsed_response = response.splitlines()[1].split()[1:]
         except IOError:
             return ["NORESPONSE"]
         except IndexError:
             return ["MALFORMED"]
-        return parsed_response
+
+        self._status_cache = (parsed_response, time.monotonic())
+        return list(parsed_response)
 
     def stop_macro(self):
         """
@@ -267,34 +750,74 @@ class HPLCController:
         """
         self.send(STOP_MACRO_CMD)
 
-    def switch_method(self, method_name: str, method_dir=DEFAULT_METHOD_DIR):
+    def switch_method(
+        self, method_name: str, method_dir=DEFAULT_METHOD_DIR, num_attempts=10
+    ):
         """
         Allows the user to switch between pre-programmed methods.
 
+        The method is loaded and queried in a single round trip. If it does
+        not match, it is queried again with the same backoff as used for
+        polling the reply file. If loading raised an error in Chemstation,
+        the method is loaded again.
+
         Args:
             method_name: any available method in Chemstation method directory
+            num_attempts: Number of times the loaded method is queried
 
         Raises:
-            IndexError: Response did not have expected format. Try again.
+            ValueError: num_attempts is less than 1.
+            IOError: Could not send the commands.
+            TimeoutError: No reply to the loaded method query.
+            RuntimeError: Loading failed or the replies were malformed.
             AssertionError: The desired method is not selected. Try again.
         """
-        self.send(
-            SWITCH_METHOD_CMD.format(method_dir=method_dir, method_name=method_name)
-        )
+        if num_attempts < 1:
+            raise ValueError(f"num_attempts must be at least 1, got {num_attempts}.")
+
+        load_cmd = f'LoadMethod "{method_dir}", "{method_name}.M"'
 
-        time.sleep(2)
-        self.send(GET_METHOD_CMD)
-        time.sleep(2)
         # check that method switched
-        for _ in range(10):
+        expected = f"{method_name}.M"
+        parsed_response = None
+        loaded = False
+        delay = self.initial_delay
+        for attempt in range(num_attempts):
+            if attempt:
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_delay)
+            if loaded:
+                cmds = [GET_METHOD_CMD]
+            else:
+                # load and query in a single round trip
+                cmds = [load_cmd, GET_METHOD_CMD]
+            try:
+                response = self.send_batch(cmds)
+            except TimeoutError as e:
+                raise TimeoutError("No reply to the loaded method query.") from e
+            # the macro replaces the response with an error line, the rest of
+            # the batch is not executed
+            if any(line.startswith("ERROR:") for line in response.splitlines()):
+                self.logger.debug("Failed to load method. Trying again.")
+                loaded = False
+                continue
+            loaded = True
             try:
-                parsed_response = self.receive().splitlines()[1].split()[1:][0]
-                break
+                parsed_response = response.splitlines()[1].split()[1:][0]
             except IndexError:
                 self.logger.debug("Malformed response. Trying again.")
                 continue
+            if parsed_response == expected:
+                return
 
-        assert parsed_response == f"{method_name}.M", "Switching Methods failed."
+        if not loaded:
+            raise RuntimeError(f"Failed to load method {expected}: {response}")
+        if parsed_response is None:
+            raise RuntimeError(
+                f"Malformed reply to the loaded method query: {response}"
+            )
+        # not an assert statement, so that the check is kept with -O
+        raise AssertionError("Switching Methods failed.")
 
     def lamp_on(self):
         """
@@ -341,11 +864,7 @@ class HPLCController:
         """
         timestamp = time.strftime(TIME_FORMAT)
 
-        self.send(
-            RUN_METHOD_CMD.format(
-                data_dir=data_dir, experiment_name=experiment_name, timestamp=timestamp
-            )
-        )
+        self.send(f'RunMethod "{data_dir}",,"{experiment_name}_{timestamp}"')
 
         folder_name = f"{experiment_name}_{timestamp}.D"
         self.data_files.append(os.path.join(data_dir, folder_name))
@@ -361,13 +880,83 @@ class HPLCController:
     def get_spectrum(self):
         """
         Load last chromatogram for any channel in spectra dictionary.
+        Channels are loaded in parallel on the background executor.
+
+        Raises:
+            RuntimeError: The controller is closed.
         """
         # will block if spectrum is measuring
         last_file = self.data_files[-1]
 
-        for channel, spec in self.spectra.items():
-            spec.load_spectrum(data_path=last_file, channel=channel)
-            self.logger.info("%s chromatogram loaded.", channel)
+        futures = {
+            channel: self._submit(
+                spec.load_spectrum, data_path=last_file, channel=channel
+            )
+            for channel, spec in self.spectra.items()
+        }
+
+        # a failed channel does not prevent loading the others
+        err = None
+        for channel, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                self.logger.error("Failed to load %s chromatogram: %s", channel, e)
+                err = err or e
+            else:
+                self.logger.info("%s chromatogram loaded.", channel)
+
+        if err is not None:
+            raise err
+
+
+class AsyncHPLCController:
+    """
+    Asyncio interface to HPLCController.
+
+    Every method of the wrapped controller is available as a coroutine, which
+    runs the blocking call in a dedicated worker thread. Calls are executed
+    one at a time in the order they were awaited, so the command sequence is
+    the same as with the synchronous controller. Other attributes (e.g.
+    spectra, data_files) are returned as is.
+
+    Example:
+        hplc = AsyncHPLCController(comm_dir)
+        await hplc.switch_method("method")
+        print(await hplc.status())
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Arguments are passed to HPLCController.
+        """
+        self.controller = HPLCController(*args, **kwargs)
+
+        # single worker to keep the commands in order
+        self._worker = ThreadPoolExecutor(max_workers=1)
+
+    def __getattr__(self, name):
+        attr = getattr(self.controller, name)
+        # only methods of the controller, not callable attributes
+        if not inspect.ismethod(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def wrapper(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._worker, functools.partial(attr, *args, **kwargs)
+            )
+
+        return wrapper
+
+    async def close(self):
+        """
+        Closes the wrapped controller and stops the worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._worker, self.controller.close)
+        self._worker.shutdown()
 
 
 if __name__ == "__main__":
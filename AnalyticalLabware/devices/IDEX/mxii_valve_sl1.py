@@ -1,3 +1,5 @@
+import logging
+import sched
 import threading
 import time
 
@@ -5,14 +7,67 @@ from SerialLabware.serial_labware import SerialDevice, command
 from SerialLabware import IKARCTDigital
 
 
+class _SharedScheduler:
+    """Runs delayed calls on a single worker thread.
+
+    The thread is started on demand and exits once no calls are pending. It
+    is not a daemon, so pending calls still run at interpreter exit.
+    """
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._scheduler = sched.scheduler(time.monotonic, self._wait)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _wait(self, timeout):
+        # returns early if a new call is scheduled meanwhile
+        self._wake.wait(timeout)
+        self._wake.clear()
+
+    def _run(self):
+        while True:
+            try:
+                self._scheduler.run()
+            except Exception:
+                # remaining calls are still due
+                self.logger.exception("Scheduled call failed.")
+                continue
+            with self._lock:
+                # calls are only added under the lock, so none can be missed
+                if self._scheduler.empty():
+                    self._thread = None
+                    return
+
+    def enter(self, delay, action, args=()):
+        """Calls `action(*args)` after `delay` seconds."""
+        with self._lock:
+            self._scheduler.enter(delay, 1, action, args)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.start()
+        self._wake.set()
+
+
 class IDEXMXIIValve(SerialDevice):
     """Two-position IDEX MX Series II HPLC valve."""
 
+    # delayed moves of all valves share one thread
+    _scheduler = _SharedScheduler()
+
+    # The last known position is assumed to hold only for this many seconds,
+    # as the valve can also be moved from the front panel, by another client
+    # or reset by a power cycle. Older positions are queried from the valve.
+    POSITION_TTL = 5
+
     def __init__(self, *params, **kwargs):
         self.baudrate = 19200
         self.command_termination = "\r"
         super().__init__(*params, **kwargs)
         self.cmd = {"MOVE_TO_1": "P01\r", "MOVE_TO_2": "P02\r", "READ_STATUS": "S00\r"}
+        # TODO: Implement multi-position valves.
+        self._move_cmds = {1: self.cmd["MOVE_TO_1"], 2: self.cmd["MOVE_TO_2"]}
         self.status_codes = {
             44: "Data CRC error",
             55: "Data integrity error",
@@ -21,6 +76,9 @@ class IDEXMXIIValve(SerialDevice):
             88: "Non-volatile memory error",
             99: "Valve cannot be homed",
         }
+        # last known valve position, None if unknown
+        self._last_position = None
+        self._position_time = 0.0
 
     @property
     @command
@@ -28,20 +86,24 @@ class IDEXMXIIValve(SerialDevice):
         try:
             self.send_message(self.cmd["READ_STATUS"], get_return=True)
         except:
+            # valve may be power cycled before reconnecting
+            self._last_position = None
             return False
         return True
 
     @property
     @command
     def status(self) -> int:
-        status = self.send_message(self.cmd["READ_STATUS"], get_return=True)
+        # int() ignores the surrounding whitespace and line terminator
+        status = int(self.send_message(self.cmd["READ_STATUS"], get_return=True))
         # Look up error code; status is okay if no error.
-        self.logger.debug(
-            "IDEX valve :: OK - status = %s (%s).",
-            status,
-            self.status_codes.get(status, "OK"),
-        )
-        return int(status.strip())
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "IDEX valve :: OK - status = %s (%s).",
+                status,
+                self.status_codes.get(status, "OK"),
+            )
+        return status
 
     def is_ready(self) -> bool:
         return self.status not in self.status_codes
@@ -51,12 +113,18 @@ class IDEXMXIIValve(SerialDevice):
         status = self.status
         if status not in self.status_codes:
             # status is position
+            self._remember_position(status)
             return status
         else:
             # status is error code
+            self._last_position = None
             error = self.status_codes[status]
             raise Exception(f"IDEX valve :: Error {status} ({error}).")
 
+    def _remember_position(self, position):
+        self._last_position = position
+        self._position_time = time.monotonic()
+
     @command
     def move_home(self):
         """Move valve to home position.
@@ -76,22 +144,36 @@ class IDEXMXIIValve(SerialDevice):
 
         Args:
             position (int): Valve position to move to."""
+        try:
+            move_cmd = self._move_cmds[position]
+        except KeyError:
+            raise ValueError("Position has to be one of 1 or 2.") from None
+
         # do nothing if already in requested position
-        if position == self.current_position:
+        # valve is only queried if the last known position is unknown/stale
+        if (
+            self._last_position is None
+            or time.monotonic() - self._position_time > self.POSITION_TTL
+        ):
+            self._last_position = self.current_position
+        if position == self._last_position:
             return position
 
-        if position == 1:
-            value = self.send_message(self.cmd["MOVE_TO_1"], get_return=True)
-        elif position == 2:
-            value = self.send_message(self.cmd["MOVE_TO_2"], get_return=True)
-        # TODO: Implement multi-position valves.
-        else:
-            raise ValueError("Position has to be one of 1 or 2.")
+        try:
+            value = self.send_message(move_cmd, get_return=True)
+        except Exception:
+            # valve state is unknown after a failed move
+            self._last_position = None
+            raise
+        self._remember_position(position)
         return value
 
     def sample(self, seconds: int, sync=False):
         """Move valve to position 2 for `seconds`, then switch back to 1.
 
+        Without `sync`, the switch back runs on a non-daemon thread, so a
+        pending return keeps the interpreter from exiting for up to `seconds`.
+
         Args:
             seconds (int): Number of seconds to stay in position 2.
             sync (bool): Whether to block the thread during sampling.
@@ -102,4 +184,4 @@ class IDEXMXIIValve(SerialDevice):
             self.move_to_position(1)
         else:
             self.move_to_position(2)
-            threading.Timer(seconds, lambda: self.move_to_position(1)).start()
+            self._scheduler.enter(seconds, self.move_to_position, (1,))
@@ -1,12 +1,22 @@
 """This module provides access and use of the Spinsolve NMR remote commands"""
 
 import os
+import sys
 import logging
+import functools
 from io import BytesIO
 
 import xml.etree.ElementTree as ET
 from xml.etree.ElementTree import ParseError
 
+try:
+    # faster parser for the large protocol options documents
+    from lxml import etree as _protocols_parser
+    from lxml.etree import XMLSyntaxError as _XMLSyntaxError
+except ImportError:
+    _protocols_parser = ET
+    _XMLSyntaxError = ParseError
+
 from .utils.exceptions import ProtocolError, ProtocolOptionsError, RequestError
 from .utils.constants import (
     SAMPLE_TAG,
@@ -15,6 +25,105 @@ from .utils.constants import (
 )
 
 
+# Messages are rendered directly, byte for byte as ElementTree would write them
+XML_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>\n"
+MESSAGE_TEMPLATE = XML_DECLARATION + "<Message>%s</Message>"
+_XML_TEXT_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_XML_ATTR_ESCAPE = str.maketrans(
+    {
+        "&": "&amp;",
+        "<": "&lt;",
+        ">": "&gt;",
+        '"': "&quot;",
+        "\r": "&#13;",
+        "\n": "&#10;",
+        "\t": "&#09;",
+    }
+)
+
+
+def _intern(text):
+    """Interns the parsed string, so that lookups with literals compare by identity"""
+
+    return text if text is None else sys.intern(text)
+
+
+def _quote_attr(value):
+    """Escapes and quotes the XML attribute value"""
+
+    return '"' + f"{value}".translate(_XML_ATTR_ESCAPE) + '"'
+
+
+def _render_element(tag, attributes="", content=""):
+    """Renders the XML element, empty elements are written as self-closing"""
+
+    if content:
+        return f"<{tag}{attributes}>{content}</{tag}>"
+    return f"<{tag}{attributes} />"
+
+
+def _parse_protocols_file(protocols_file):
+    """Parses the XML file with the preferred parser.
+
+    The file is opened here, so that a missing file raises FileNotFoundError
+    with either parser.
+    """
+
+    with open(protocols_file, "rb") as file:
+        return _protocols_parser.parse(file)
+
+
+@functools.lru_cache(maxsize=None)
+def _default_spinsolve_commands_file():
+    """Path to the ProtocolOptions file in the standard Magritek folder"""
+
+    return os.path.join(
+        os.path.expanduser("~"),
+        "Documents",
+        "Magritek",
+        "Spinsolve",
+        "ProtocolOptions.xml",
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _load_protocols_file(protocols_file, mtime_ns):
+    """Parses the protocols file, cached on its path and modification time.
+
+    The modification time is only used as a part of the cache key, so that an
+    updated file is parsed again.
+    """
+
+    commands_root = _parse_protocols_file(protocols_file).getroot()
+    return {
+        element.get("protocol"): element for element in commands_root.iter("Protocol")
+    }
+
+
+@functools.lru_cache(maxsize=4)
+def _load_protocols_message(device_message):
+    """Parses the protocols message, cached on the message content.
+
+    The message is parsed incrementally and everything outside of the protocol
+    elements is cleared as soon as it is parsed.
+    """
+
+    protocols = {}
+    open_protocols = 0
+    for event, element in _protocols_parser.iterparse(
+        BytesIO(device_message), events=("start", "end")
+    ):
+        if element.tag == "Protocol":
+            if event == "start":
+                open_protocols += 1
+            else:
+                open_protocols -= 1
+                protocols[element.get("protocol")] = element
+        elif event == "end" and not open_protocols:
+            element.clear()
+    return protocols
+
+
 def load_commands_from_file(protocols_path=None):
     """Loads NMR protocol commands and options from XML file.
 
@@ -37,13 +146,11 @@ def load_commands_from_file(protocols_path=None):
     # If the xml wasn't provided check for it in the standard Magritek folder
     # where it is created by default, <current_user>/Documents/Magritek/Spinsolve
     if protocols_path is None:
-        current_user = os.getlogin()
-        spinsolve_folder = os.path.join(
-            "C:\\", "Users", current_user, "Documents", "Magritek", "Spinsolve"
-        )
-        spinsolve_commands_file = os.path.join(spinsolve_folder, "ProtocolOptions.xml")
+        spinsolve_commands_file = _default_spinsolve_commands_file()
         try:
-            commands_tree = ET.parse(spinsolve_commands_file)
+            protocols = _load_protocols_file(
+                spinsolve_commands_file, os.stat(spinsolve_commands_file).st_mtime_ns
+            )
         except FileNotFoundError:
             raise ProtocolError(
                 "The ProtocolOptions file wasn't found in the original folder \n Please check or supply the file manually"
@@ -51,22 +158,21 @@ def load_commands_from_file(protocols_path=None):
     else:
         protocol_options_file = os.path.join(protocols_path, "ProtocolOptions.xml")
         try:
-            commands_tree = ET.parse(protocol_options_file)
-        except ParseError:
+            protocols = _load_protocols_file(
+                protocol_options_file, os.stat(protocol_options_file).st_mtime_ns
+            )
+        except (ParseError, _XMLSyntaxError):
             raise ProtocolError("Supply file is not a valid XML document") from None
-    commands_root = commands_tree.getroot()
-    protocols = {
-        element.get("protocol"): element for element in commands_root.iter("Protocol")
-    }
-    return protocols
+    # copy, so that the cached mapping is never altered by the caller
+    return dict(protocols)
 
 
 def load_commands_from_device(device_message):
     """Loads command list from the connected device
 
     Args:
-        device_message (bytes): A message from the instrument containing all possible
-            protocols and their options
+        device_message (Union[bytes, str]): A message from the instrument containing
+            all possible protocols and their options
 
     Returns:
         dict: A dictionary containing protocol name as a key and XML element as a value
@@ -75,11 +181,11 @@ def load_commands_from_device(device_message):
             {'1D PROTON': <Element 'Protocol'>, '1D CARBON': <Element 'Protocol'>}
     """
 
-    commands_root = ET.fromstring(device_message)
-    protocols = {
-        element.get("protocol"): element for element in commands_root.iter("Protocol")
-    }
-    return protocols
+    # the incremental parser only accepts bytes
+    if isinstance(device_message, str):
+        device_message = device_message.encode("utf-8")
+
+    return dict(_load_protocols_message(device_message))
 
 
 class ProtocolCommands:
@@ -102,6 +208,17 @@ class ProtocolCommands:
     # The XML message syntax is similar to "Start protocol"
     ESTIMATE_DURATION_REQUEST = "EstimateDurationRequest"
 
+    # Message templates, values are escaped and quoted when substituted
+    _OPTION_TEMPLATE = "<Option name=%s value=%s />"
+
+    # Shimming on sample always has the same shape, only the values change
+    _SHIM_ON_SAMPLE_TEMPLATE = (
+        XML_DECLARATION
+        + f"<Message><Start protocol={_quote_attr(SHIM_ON_SAMPLE_PROTOCOL)}>"
+        + '<Option name="SampleReference" value={} />'
+        + '<Option name="Shim" value={} /></Start></Message>'
+    )
+
     def __init__(self, protocols_path=None):
         """Initialiser for the protocol commands
 
@@ -120,6 +237,7 @@ class ProtocolCommands:
         self.logger = logging.getLogger("spinsolve.commandsapi")
 
         self._protocols = load_commands_from_file(protocols_path)
+        self._index_protocols()
 
     def __iter__(self):
         """Yields every protocol name"""
@@ -156,11 +274,12 @@ class ProtocolCommands:
         """
 
         # Checking supplied argument types
-        self.logger.debug(
-            "Checking the supplied attributes for the protocol <%s> - <%s>",
-            protocol_and_options[0],
-            protocol_and_options[1],
-        )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Checking the supplied attributes for the protocol <%s> - <%s>",
+                protocol_and_options[0],
+                protocol_and_options[1],
+            )
         if (
             not isinstance(protocol_and_options, tuple)
             or len(protocol_and_options) != 2
@@ -169,9 +288,8 @@ class ProtocolCommands:
                 "Supplied argument must be a tuple with exactly two items: protocol name and protocol options as dict"
             )
         try:
-            full_command = self.get_protocol(
-                protocol_and_options[0]
-            )  # Loading the full command dictionary for future validation
+            # Loading the allowed option values for future validation
+            allowed_options = self._allowed_values[protocol_and_options[0]]
         except KeyError:
             raise ProtocolError(
                 "Supplied protocol <{}> is not a valid protocol".format(
@@ -184,7 +302,8 @@ class ProtocolCommands:
                 value = str(value)
                 # If the value list is empty but the value is expected, e.g. SHIM 1H SAMPLE - SampleReference
                 # All value checks should be performed when the method called
-                if value not in full_command[1].get(key) and full_command[1].get(key):
+                allowed_values = allowed_options[key]
+                if allowed_values and value not in allowed_values:
                     raise ProtocolOptionsError(
                         "Supplied value <{}> is not valid for the option <{}>".format(
                             value, key
@@ -203,28 +322,23 @@ class ProtocolCommands:
                 )
             ) from None
 
-        # Creating an empty bytes object to write the future XML message
-        msg = BytesIO()
-        # First element of the XML message
-        msg_root = ET.Element("Message")
-        # First subelement of the message root as <"command"/>
-        # with attributes as "command_option_key"="command_option_value"
-        msg_root_command = ET.SubElement(
-            msg_root, custom_tag, {"protocol": f"{protocol_and_options[0]}"}
+        # <"command"/> with attributes as "command_option_key"="command_option_value"
+        # and an <Option /> for every additional option
+        options = "".join(
+            [
+                self._OPTION_TEMPLATE % (_quote_attr(key), _quote_attr(value))
+                for key, value in protocol_and_options[1].items()
+            ]
         )
-        # If additional options required
-        for key, value in protocol_and_options[1].items():
-            _ = ET.SubElement(
-                msg_root_command, "Option", {"name": f"{key}", "value": f"{value}"}
-            )
-        # Growing a message XML tree with the <Message /> root
-        msg_tree = ET.ElementTree(msg_root)
-        # Writing the message tree to msg object
-        msg_tree.write(msg, encoding="utf-8", xml_declaration=True)
+        command = _render_element(
+            custom_tag, f" protocol={_quote_attr(protocol_and_options[0])}", options
+        )
+        msg = (MESSAGE_TEMPLATE % command).encode("utf-8")
 
-        self.logger.debug("Message built: <%s>", msg.getvalue())
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Message built: <%s>", msg)
 
-        return msg.getvalue()
+        return msg
 
     def get_protocol(self, protocol_name):
         """Obtains the command from XML with all available options
@@ -240,20 +354,47 @@ class ProtocolCommands:
             ProtocolError
         """
 
-        protocol_options = {}
         try:
-            for option_element in self._protocols[protocol_name].findall(".//Option"):
-                option = option_element.get("name")
-                option_values = []
-                for value_element in option_element:
-                    if value_element.text is not None:
-                        option_values.append(value_element.text)
-                protocol_options[option] = option_values
+            protocol_options = self._protocol_options[protocol_name]
         except KeyError:
             raise ProtocolError(
                 "Supplied protocol <{}> is not a valid protocol".format(protocol_name)
             ) from None
-        return (protocol_name, protocol_options)
+        # copy, so that the stored options are never altered by the caller
+        return (
+            protocol_name,
+            {option: list(values) for option, values in protocol_options.items()},
+        )
+
+    @staticmethod
+    def _build_options(protocol_element):
+        """Collects all options of the protocol element with their possible values"""
+
+        protocol_options = {}
+        for option_element in protocol_element.iter("Option"):
+            option = _intern(option_element.get("name"))
+            option_values = []
+            for value_element in option_element:
+                # lxml also yields comments, their tag is not a string
+                if not isinstance(value_element.tag, str):
+                    continue
+                if value_element.text is not None:
+                    option_values.append(sys.intern(value_element.text))
+            protocol_options[option] = option_values
+        return protocol_options
+
+    def _index_protocols(self):
+        """Pre-indexes the options of every loaded protocol"""
+
+        self._protocol_options = {
+            _intern(name): self._build_options(element)
+            for name, element in self._protocols.items()
+        }
+        # same options with the values as sets for the command validation
+        self._allowed_values = {
+            name: {option: frozenset(values) for option, values in options.items()}
+            for name, options in self._protocol_options.items()
+        }
 
     def reload_commands(self, data):
         """Reload the protocols from the supplied data
@@ -263,7 +404,11 @@ class ProtocolCommands:
         """
 
         self.logger.debug("Requested protocols update")
-        self._protocols = load_commands_from_device(data)
+        protocols = load_commands_from_device(data)
+        # an unchanged message yields the same cached elements, index is still valid
+        if protocols != self._protocols:
+            self._protocols = protocols
+            self._index_protocols()
         self.logger.info("Protocols dictionary updated")
 
     ### For easier access the following properties are added ###
@@ -282,10 +427,23 @@ class ProtocolCommands:
         else:
             raise ProtocolOptionsError("Supplied reference peak must be float!")
 
+        option = f"{option}"
+        # Fast path when any reference is accepted and the shimming method is known
+        # Otherwise the full validation reports what is wrong
+        allowed_options = self._allowed_values.get(self.SHIM_ON_SAMPLE_PROTOCOL, {})
+        if (
+            allowed_options.keys() == {"SampleReference", "Shim"}
+            and not allowed_options["SampleReference"]
+            and option in allowed_options["Shim"]
+        ):
+            return self._SHIM_ON_SAMPLE_TEMPLATE.format(
+                _quote_attr(reference_peak), _quote_attr(option)
+            ).encode("utf-8")
+
         return self.generate_command(
             (
                 self.SHIM_ON_SAMPLE_PROTOCOL,
-                {"SampleReference": f"{reference_peak}", "Shim": f"{option}"},
+                {"SampleReference": reference_peak, "Shim": option},
             )
         )
 
@@ -342,6 +500,42 @@ class RequestCommands:
     DATA_FOLDER_TAG = "DataFolder"
     DATA_FOLDER_METHODS = ["UserFolder", "TimeStamp", "TimeStampTree"]
 
+    # Message templates, values are escaped and quoted when substituted
+    _DATA_TEMPLATE = "<Data key=%s value=%s />"
+
+    # Constant messages, prebuilt as generate_request would render them
+    _HARDWARE_REQUEST_MSG = (
+        b"<?xml version='1.0' encoding='utf-8'?>\n"
+        b"<Message><HardwareRequest /></Message>"
+    )
+    _AVAILABLE_PROTOCOL_OPTIONS_REQUEST_MSG = (
+        b"<?xml version='1.0' encoding='utf-8'?>\n"
+        b"<Message><AvailableProtocolOptionsRequest /></Message>"
+    )
+    _ABORT_REQUEST_MSG = (
+        b"<?xml version='1.0' encoding='utf-8'?>\n<Message><Abort /></Message>"
+    )
+    _SHIM_REQUEST_MSGS = {
+        CHECK_SHIM_REQUEST: b"<?xml version='1.0' encoding='utf-8'?>\n"
+        b"<Message><CheckShimRequest /></Message>",
+        QUICK_SHIM_REQUEST: b"<?xml version='1.0' encoding='utf-8'?>\n"
+        b"<Message><QuickShimRequest /></Message>",
+        POWER_SHIM_REQUEST: b"<?xml version='1.0' encoding='utf-8'?>\n"
+        b"<Message><PowerShimRequest /></Message>",
+    }
+    _GET_USER_DATA_MSG = (
+        b"<?xml version='1.0' encoding='utf-8'?>\n"
+        b"<Message><GetRequest><UserData /></GetRequest></Message>"
+    )
+    _GET_SOLVENT_MSG = (
+        b"<?xml version='1.0' encoding='utf-8'?>\n"
+        b"<Message><GetRequest><Solvent /></GetRequest></Message>"
+    )
+    _GET_SAMPLE_MSG = (
+        b"<?xml version='1.0' encoding='utf-8'?>\n"
+        b"<Message><GetRequest><Sample /></GetRequest></Message>"
+    )
+
     def __init__(self):
 
         self.logger = logging.getLogger("spinsolve.requestsapi")
@@ -361,63 +555,59 @@ class RequestCommands:
             to be sent to the NMR instrument
         """
 
-        self.logger.debug(
-            "Generating request from the supplied attributes: tag - <%s>; options - <%s>",
-            tag,
-            options,
-        )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Generating request from the supplied attributes: tag - <%s>; options - <%s>",
+                tag,
+                options,
+            )
 
-        # Creating an empty bytes object to write the future XML message
-        msg = BytesIO()
-        # First element of the XML message
-        msg_root = ET.Element("Message")
-        # First subelement of the message root as <"command"/>
-        # with attributes as "command_option_key"="command_option_value"
-        msg_root_element = ET.SubElement(msg_root, f"{tag}")
+        content = ""
         # Special case - UserData
         if options is not None and USER_DATA_TAG in options:
             # Removing the appended key
             options.pop(USER_DATA_TAG)
-            # Creating new subelement
-            user_data_subelement = ET.SubElement(msg_root_element, USER_DATA_TAG)
-            for key, value in options.items():
-                subelem = ET.SubElement(
-                    user_data_subelement, "Data", {"key": f"{key}", "value": f"{value}"}
-                )
+            user_data = "".join(
+                [
+                    self._DATA_TEMPLATE % (_quote_attr(key), _quote_attr(value))
+                    for key, value in options.items()
+                ]
+            )
+            content = _render_element(USER_DATA_TAG, content=user_data)
         elif options is not None:
-            for key, value in options.items():
-                subelem = ET.SubElement(msg_root_element, f"{key}")
-                subelem.text = value
-        # Growing a message XML tree with the <Message /> root
-        msg_tree = ET.ElementTree(msg_root)
-        # Writing the message tree to msg object
-        msg_tree.write(msg, encoding="utf-8", xml_declaration=True)
+            content = "".join(
+                [
+                    _render_element(
+                        key, content=value.translate(_XML_TEXT_ESCAPE) if value else ""
+                    )
+                    for key, value in options.items()
+                ]
+            )
+        request = _render_element(tag, content=content)
+        msg = (MESSAGE_TEMPLATE % request).encode("utf-8")
 
-        self.logger.debug("Request generated: <%s>", msg.getvalue())
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Request generated: <%s>", msg)
 
-        return msg.getvalue()
+        return msg
 
     def request_shim(self, shim_request_option):
         """Returns the message for shimming the instrument"""
 
-        if shim_request_option not in [
-            self.CHECK_SHIM_REQUEST,
-            self.POWER_SHIM_REQUEST,
-            self.QUICK_SHIM_REQUEST,
-        ]:
-            raise RequestError("Supplied shimming option is not valid")
-
-        return self.generate_request(shim_request_option)
+        try:
+            return self._SHIM_REQUEST_MSGS[shim_request_option]
+        except KeyError:
+            raise RequestError("Supplied shimming option is not valid") from None
 
     def request_hardware(self):
         """Returns the message for the hardware request"""
 
-        return self.generate_request(self.HARDWARE_REQUEST)
+        return self._HARDWARE_REQUEST_MSG
 
     def request_available_protocol_options(self):
         """Returns the message to request full list of available protocols and their options"""
 
-        return self.generate_request(self.AVAILABLE_PROTOCOL_OPTIONS_REQUEST)
+        return self._AVAILABLE_PROTOCOL_OPTIONS_REQUEST_MSG
 
     def set_solvent_data(self, solvent):
         """Returns the message to set the solvent data.
@@ -471,25 +661,25 @@ class RequestCommands:
     def abort(self):
         """Returns the message to abort the current operation"""
 
-        return self.generate_request(self.ABORT_REQUEST)
+        return self._ABORT_REQUEST_MSG
 
     def get_user_data(self):
         """
         Returns the message for querying the user data from the instrument.
         """
 
-        return self.generate_request(self.GET_REQUEST, {USER_DATA_TAG: ""})
+        return self._GET_USER_DATA_MSG
 
     def get_solvent(self):
         """
         Returns the message for querying the solvent data from the instrument.
         """
 
-        return self.generate_request(self.GET_REQUEST, {SOLVENT_TAG: ""})
+        return self._GET_SOLVENT_MSG
 
     def get_sample(self):
         """
         Returns the message for querying the sample data from the instrument.
         """
 
-        return self.generate_request(self.GET_REQUEST, {SAMPLE_TAG: ""})
+        return self._GET_SAMPLE_MSG
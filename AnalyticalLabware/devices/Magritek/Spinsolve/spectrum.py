@@ -2,12 +2,16 @@
 
 # pylint: disable=attribute-defined-outside-init
 import os
+import re
 import logging
 import time
+import functools
+from datetime import datetime
 from typing import Union
 
 import numpy as np
 import scipy
+import scipy.fft
 import nmrglue as ng
 import matplotlib.pyplot as plt
 
@@ -20,6 +24,9 @@ ACQUISITION_PARAMETERS = "acqu.par"
 PROCESSED_SPECTRUM = "spectrum_processed.1d"  # not always present
 PROTOCOL_PARAMETERS = "protocol.par"
 
+# every line of the parameters file, as Param = "Value"
+PARAMETER_LINE = re.compile(r"^([^=\n]*)=(.*)$", re.MULTILINE)
+
 # format used in acquisition parameters
 TIME_FORMAT = r"%Y-%m-%dT%H:%M:%S.%f"
 
@@ -33,6 +40,64 @@ SHIMMING_FID = "sample_fid.1d"
 SHIMMING_SPECTRUM = "spectrum.1d"
 
 
+@functools.lru_cache(maxsize=16)
+def _parse_time(time_string):
+    """Parses the acquisition time into time.struct_time.
+
+    datetime.fromisoformat is much faster than time.strptime, which is kept
+    as a fallback for the strings it does not accept.
+    """
+
+    try:
+        return datetime.fromisoformat(time_string).timetuple()
+    except ValueError:
+        return time.strptime(time_string, TIME_FORMAT)
+
+
+def _keep_precision(result, data):
+    """Casts the result of nmrglue function back to single precision, if the
+    data was in single precision, as nmrglue computes in double precision.
+    """
+
+    if (
+        result.dtype.kind == data.dtype.kind
+        and result.dtype.itemsize > data.dtype.itemsize
+    ):
+        return result.astype(data.dtype)
+    return result
+
+
+@functools.lru_cache(maxsize=16)
+def _apodization_window(function, size, dtype, params):
+    """Builds the nmrglue window function by applying it to ones"""
+
+    window = getattr(ng.process.proc_base, function)(
+        np.ones(size, dtype=dtype), **dict(params)
+    )
+    # shared between the calls
+    window.flags.writeable = False
+    return window
+
+
+def _apodize(data, function, **params):
+    """Applies the nmrglue window function, windows are reused for the same
+    data size and type and the same parameters.
+    """
+
+    window = _apodization_window(
+        function, data.shape[-1], data.dtype, tuple(sorted(params.items()))
+    )
+    return window * data
+
+
+def _nmr_fft(data):
+    """Fourier transform, NMR ordering of the results."""
+
+    return scipy.fft.fftshift(
+        scipy.fft.fft(data, axis=-1).astype(data.dtype, copy=False), -1
+    )
+
+
 class SpinsolveNMRSpectrum(AbstractSpectrum):
     """Class for NMR spectrum loading and handling."""
 
@@ -51,6 +116,9 @@ class SpinsolveNMRSpectrum(AbstractSpectrum):
 
         self.logger = logging.getLogger("spinsolve.spectrum")
 
+        # axis mapping is updated with the data, so each instance owns a copy
+        self.AXIS_MAPPING = dict(self.AXIS_MAPPING)
+
         # updating public properties to include the universal dictionary
         self.PUBLIC_PROPERTIES.add("udic")
         # and parameters
@@ -112,9 +180,7 @@ class SpinsolveNMRSpectrum(AbstractSpectrum):
             }
 
             # updating last shimming time
-            self.last_shimming_time = time.strptime(
-                self.parameters["CurrentTime"], TIME_FORMAT
-            )
+            self.last_shimming_time = _parse_time(self.parameters["CurrentTime"])
 
             # updating file names for the shimming
             processed_path = os.path.join(data_path, SHIMMING_SPECTRUM)
@@ -125,7 +191,7 @@ class SpinsolveNMRSpectrum(AbstractSpectrum):
         self.data_path = data_path
 
         # extracting the time from acquisition parameters
-        spectrum_time = time.strptime(self.parameters["CurrentTime"], TIME_FORMAT)
+        spectrum_time = _parse_time(self.parameters["CurrentTime"])
 
         if start_time is not None:
             timestamp = round(time.mktime(spectrum_time) - start_time)
@@ -134,16 +200,18 @@ class SpinsolveNMRSpectrum(AbstractSpectrum):
 
         # loading raw fid data
         if not preprocessed:
-            x_axis, y_real, y_img = self.extract_data(fid_path)
-            spectrum_data = np.array(y_real + y_img * 1j)
+            x_axis, y_data = self._read_data(fid_path)
+            # interleaved float pairs are complex numbers already
+            spectrum_data = y_data.view("<c8").ravel()
+
+            bandwidth = self.parameters["bandwidth"] * 1e3
 
             # updating the universal dictionary
             self.udic[0].update(
                 # spectral width in kHz
-                sw=self.parameters["bandwidth"] * 1e3,
+                sw=bandwidth,
                 # carrier frequency
-                car=self.parameters["bandwidth"] * 1e3 / 2
-                + self.parameters["lowestFrequency"],
+                car=bandwidth / 2 + self.parameters["lowestFrequency"],
                 # observed frequency
                 obs=self.parameters["b1Freq"],
                 # number of points
@@ -212,17 +280,34 @@ supplied directory <{data_path}>"
 
         """
 
-        # reading data with numpy fromfile
-        # the header is discarded
-        spectrum_data = np.fromfile(spectrum_path, dtype="<f")[8:]
-
-        x_axis = spectrum_data[: len(spectrum_data) // 3]
+        x_axis, y_data = self._read_data(spectrum_path)
 
         # breaking the rest of the data into real and imaginary part
-        y_real = spectrum_data[len(spectrum_data) // 3 :][::2]
-        y_img = spectrum_data[len(spectrum_data) // 3 :][1::2]
+        return (x_axis, y_data[:, 0], y_data[:, 1])
+
+    @staticmethod
+    def _read_data(spectrum_path):
+        """Reads the spectrum file as X axis and (real, imaginary) pairs of the
+        Y axis, both are views on the same buffer.
+        """
+
+        # reading the whole file at once into a writable buffer
+        with open(spectrum_path, "rb") as fileobj:
+            buffer = bytearray(os.fstat(fileobj.fileno()).st_size)
+            size = fileobj.readinto(buffer)
+
+        # the header is discarded, incomplete trailing bytes are ignored
+        spectrum_data = np.frombuffer(
+            buffer, dtype="<f", count=max(size - 32, 0) // 4, offset=min(size, 32)
+        )
 
-        return (x_axis, y_real, y_img)
+        points = spectrum_data.size // 3
+
+        # floats of a truncated last point are dropped, as X and Y must match
+        return (
+            spectrum_data[:points],
+            spectrum_data[points : 3 * points].reshape(-1, 2),
+        )
 
     def extract_parameters(self, params_path):
         """Get the NMR parameters from the given folder.
@@ -237,27 +322,26 @@ supplied directory <{data_path}>"
         # loading spectrum parameters
         spec_params = {}
         with open(params_path) as fileobj:
-            param = fileobj.readline()
-            while param:
-                # in form of "Param"       = "Value"\n
-                parameter, value = param.split("=", maxsplit=1)
-                # stripping from whitespaces, newlines and extra doublequotes
-                parameter = parameter.strip()
-                value = value.strip(' \n"')
-                # special case: userData
-                # converting to nested dict
-                if parameter == "userData" and value:
-                    values = value.split(";")
-                    value = {}
-                    for key_value in values:
-                        key, val = key_value.split("=")
-                        value[key] = val
-                # converting values to float if possible
-                try:
-                    spec_params[parameter] = float(value)
-                except (ValueError, TypeError):
-                    spec_params[parameter] = value
-                param = fileobj.readline()
+            text = fileobj.read()
+
+        # in form of "Param"       = "Value"\n
+        for match in PARAMETER_LINE.finditer(text):
+            # stripping from whitespaces, newlines and extra doublequotes
+            parameter = match[1].strip()
+            value = match[2].strip(' \n"')
+            # special case: userData
+            # converting to nested dict
+            if parameter == "userData" and value:
+                values = value.split(";")
+                value = {}
+                for key_value in values:
+                    key, val = key_value.split("=")
+                    value[key] = val
+            # converting values to float if possible
+            try:
+                spec_params[parameter] = float(value)
+            except (ValueError, TypeError):
+                spec_params[parameter] = value
 
         return spec_params
 
@@ -323,7 +407,8 @@ supplied directory <{data_path}>"
     def fft(self, in_place=True):
         """Fourier transformation, NMR ordering of the results.
 
-        This is the wrapper around nmrglue.process.proc_base.fft function.
+        Same as nmrglue.process.proc_base.fft function, but computed with
+        scipy.fft, which keeps single precision data in single precision.
         Please refer to original function documentation for details.
 
         Args:
@@ -336,7 +421,7 @@ supplied directory <{data_path}>"
         """
 
         if in_place:
-            self.y = ng.proc_base.fft(self.y)
+            self.y = _nmr_fft(self.y)
 
             # updating x and y axis
             self.AXIS_MAPPING.update(x="ppm")
@@ -347,7 +432,7 @@ supplied directory <{data_path}>"
             self.udic[0]["freq"] = True
 
         else:
-            return ng.proc_base.fft(self.y)
+            return _nmr_fft(self.y)
 
     def autophase(self, in_place=True, function="peak_minima", p0=0.0, p1=0.0):
         """Automatic linear phase correction. FFT is performed!
@@ -375,7 +460,9 @@ supplied directory <{data_path}>"
         if self.AXIS_MAPPING["x"] == "time":
             self.fft()
 
-        autophased = ng.process.proc_autophase.autops(self.y, function, p0, p1)
+        autophased = _keep_precision(
+            ng.process.proc_autophase.autops(self.y, function, p0, p1), self.y
+        )
 
         if in_place:
             self.y = autophased
@@ -406,7 +493,9 @@ supplied directory <{data_path}>"
         if self.AXIS_MAPPING["x"] == "time":
             self.fft()
 
-        corrected = ng.process.proc_bl.baseline_corrector(self.y, wd)
+        corrected = _keep_precision(
+            ng.process.proc_bl.baseline_corrector(self.y, wd), self.y
+        )
 
         if in_place:
             self.y = corrected
@@ -554,38 +643,49 @@ Golay ("savgol") smoothing routine'
         """
         # TODO check for Fourier transformation!
 
+        window_params = self._window_params(function, params)
+        if window_params is None:
+            return
+
+        if in_place:
+            self.y = _apodize(self.y, function, **window_params)
+            return
+
+        return _apodize(self.y, function, **window_params)
+
+    def _window_params(self, function, params):
+        """Converts the window function parameters into NMRPipe-like, as
+        expected by the nmrglue functions.
+
+        Returns None for unknown window function.
+        """
+
+        spectral_width = self.udic[0]["sw"]
+
         if function == "em":
             # converting lb value to NMRPipe-like
             if "lb" in params:
                 # deviding by spectral width in Hz
-                params["lb"] = params["lb"] / self.udic[0]["sw"]
-
-            if in_place:
-                self.y = ng.process.proc_base.em(self.y, **params)
-                return
+                params["lb"] = params["lb"] / spectral_width
 
-            return ng.process.proc_base.em(self.y, **params)
+            return params
 
         elif function == "gm":
             # converting values into NMRPipe-like
             if "g1" in params:
-                params["g1"] = params["g1"] / self.udic[0]["sw"]
+                params["g1"] = params["g1"] / spectral_width
 
             if "g2" in params:
-                params["g2"] = params["g2"] / self.udic[0]["sw"]
+                params["g2"] = params["g2"] / spectral_width
 
-            if in_place:
-                self.y = ng.process.proc_base.gm(self.y, **params)
-                return
-
-            return ng.process.proc_base.gm(self.y, **params)
+            return params
 
         elif function == "gmb":
             # converting values into NMRPipe-like
             # for formula reference see documentation and source code of
             # nmrglue.proc_base.gmb function and NMRPipe GMB command reference
             if "lb" in params:
-                a = np.pi * params["lb"] / self.udic[0]["sw"]
+                a = np.pi * params["lb"] / spectral_width
             else:
                 a = 0.0
 
@@ -594,11 +694,9 @@ Golay ("savgol") smoothing routine'
             else:
                 b = 0.0
 
-            if in_place:
-                self.y = ng.process.proc_base.gmb(self.y, a=a, b=b)
-                return
+            return {"a": a, "b": b}
 
-            return ng.process.proc_base.gmb(self.y, a=a, b=b)
+        return None
 
     def zero_fill(self, n=1, in_place=True):
         """Zero filling the data by 2**n.
@@ -622,18 +720,48 @@ skipped"
                 )
                 return
 
-            # extending y axis
-            self.y = ng.process.proc_base.zf_double(self.y, n)
+            self._update_zero_filled(ng.process.proc_base.zf_double(self.y, n), n)
+            return
+
+        return ng.process.proc_base.zf_double(self.y, n)
 
-            # extending x axis
-            self.x = np.linspace(self.x[0], self.x[-1] * 2**n, self.y.shape[0])
+    def _update_zero_filled(self, zero_filled, n):
+        """Updates the spectrum with zero filled data and extends the axis"""
 
-            # updating udic and uc
-            self.udic[0].update(size=self.x.size)
-            self._uc = ng.fileio.fileiobase.uc_from_udic(self.udic)
+        # extending y axis
+        self.y = zero_filled
+
+        # extending x axis
+        self.x = np.linspace(self.x[0], self.x[-1] * 2**n, self.y.shape[0])
+
+        # updating udic and uc
+        self.udic[0].update(size=self.x.size)
+        self._uc = ng.fileio.fileiobase.uc_from_udic(self.udic)
+
+    def _apodize_zero_fill(self, function, n=1, **params):
+        """Applies the window function and zero fills the data by 2**n.
+
+        Same as apodization followed by zero_fill, but the windowed data is
+        written directly into the zero filled array.
+        """
+
+        # copy, as the parameters are converted again if not fused
+        window_params = self._window_params(function, dict(params))
+
+        # fusing is only possible when both steps apply
+        if window_params is None or self.AXIS_MAPPING["x"] == "ppm":
+            self.apodization(function=function, **params)
+            self.zero_fill(n)
             return
 
-        return ng.process.proc_base.zf_double(self.y, n)
+        size = self.y.shape[-1]
+        window = _apodization_window(
+            function, size, self.y.dtype, tuple(sorted(window_params.items()))
+        )
+        zero_filled = np.zeros(size * 2**n, dtype=self.y.dtype)
+        np.multiply(window, self.y, out=zero_filled[:size])
+
+        self._update_zero_filled(zero_filled, n)
 
     def generate_peak_regions(
         self,
@@ -662,37 +790,33 @@ skipped"
             self.logger.warning("Please perform FFT first.")
             return np.array([[]])
 
-        # placeholder
-        peak_map = np.full_like(self.x, False)
-
         if magnitude:
             # looking for peaks in magnitude mode
-            magnitude_spectrum = np.sqrt(self.y.real**2 + self.y.imag**2)
-            # mapping
-            peak_map = np.logical_or(
-                create_binary_peak_map(magnitude_spectrum), peak_map
-            )
+            spectrum = np.abs(self.y)
         else:
-            peak_map = np.logical_or(create_binary_peak_map(self.y), peak_map)
+            spectrum = self.y
+        # mapping, the magnitude spectrum is only mapped after the
+        # derivative and smoothed versions are computed from it
+        derived_maps = []
 
+        # temporary arrays are mapped without copying
         # additionally in the derivative
         if derivative:
-            try:
-                derivative_map = create_binary_peak_map(np.gradient(magnitude_spectrum))
-            except NameError:
-                derivative_map = create_binary_peak_map(np.gradient(self.y))
-            # combining
-            peak_map = np.logical_or(derivative_map, peak_map)
+            derived_maps.append(
+                create_binary_peak_map(np.gradient(spectrum), copy=False)
+            )
 
         # and in the smoothed version
         if smoothed:
-            try:
-                smoothed = scipy.ndimage.gaussian_filter1d(magnitude_spectrum, 3)
-            except NameError:
-                # smoothing only supported on non-complex data
-                smoothed = scipy.ndimage.gaussian_filter1d(self.y.real, 3)
-            # combining
-            peak_map = np.logical_or(create_binary_peak_map(smoothed), peak_map)
+            # smoothing only supported on non-complex data
+            smoothed = scipy.ndimage.gaussian_filter1d(spectrum.real, 3)
+            derived_maps.append(create_binary_peak_map(smoothed, copy=False))
+
+        peak_map = create_binary_peak_map(spectrum, copy=not magnitude)
+
+        # combining in place
+        for derived_map in derived_maps:
+            np.logical_or(peak_map, derived_map, out=peak_map)
 
         # extracting the regions from the full map
         regions = combine_map_to_regions(peak_map)
@@ -720,8 +844,7 @@ skipped"
         """
         # TODO add processing for various nucleus
         if self.parameters["rxChannel"] == "19F":
-            self.apodization(function="gm", g1=1.2, g2=4.5)
-            self.zero_fill()
+            self._apodize_zero_fill("gm", g1=1.2, g2=4.5)
             self.fft()
             self.correct_baseline()
             self.autophase()
@@ -764,14 +887,14 @@ skipped"
                 each region of interest.
         """
 
+        # imaginary part is discarded beforehand, as integration is linear
         result = ng.analysis.integration.integrate(
-            data=self.y,
+            data=self.y.real,
             unit_conv=self._uc,
             limits=self.x[regions],  # directly get the ppm values
         )
 
-        # discarding imaginary part
-        return np.abs(np.real(result))
+        return np.abs(result)
 
     def reference_spectrum(
         self,
@@ -795,14 +918,19 @@ skipped"
         if isinstance(reference, str):
             if reference == "highest":
                 # Looking for highest point
-                reference = self.x[np.argmax(self.y)]
+                reference = self.x[np.argmax(self.y.real)]
             elif reference == "closest":
                 # Looking for closest peak among found across whole spectrum
                 # Specifying area not to update self.peaks
                 peaks = self.find_peaks(area=(self.x.min(), self.x.max()))
-                # x coordinate
+                # x coordinate, peaks follow the monotonic x axis
                 peaks_xs = peaks[:, 1].real
-                reference = peaks[np.argmin(np.abs(peaks_xs - new_position))][1].real
+                if peaks_xs.size > 1 and peaks_xs[0] > peaks_xs[-1]:
+                    peaks_xs = peaks_xs[::-1]
+                # only the peaks around the new position can be the closest
+                index = np.searchsorted(peaks_xs, new_position)
+                neighbours = peaks_xs[max(index - 1, 0) : index + 1]
+                reference = neighbours[np.argmin(np.abs(neighbours - new_position))]
             else:
                 self.logger.warning(
                     'Please use either "highest" or "closest"\
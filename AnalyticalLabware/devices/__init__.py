@@ -5,7 +5,7 @@ from .OceanOptics.Raman.raman_control import OceanOpticsRaman
 from .OceanOptics.UV.QEPro2192 import QEPro2192
 from .OceanOptics.IR.NIRQuest512 import NIRQuest512
 from .DrDAQ.pH_module import DrDaqPHModule
-from .Agilent.hplc import HPLCController
+from .Agilent.hplc import HPLCController, AsyncHPLCController
 
 # chemputer-related instruments
 from .chemputer_devices import *
@@ -0,0 +1,29 @@
+import numpy as np
+
+from AnalyticalLabware.analysis.base_spectrum import AbstractSpectrum
+
+
+class DummySpectrum(AbstractSpectrum):
+    """Minimal concrete spectrum to exercise the generic processing."""
+
+    def __init__(self, x, y):
+        super().__init__(path=False, autosaving=False)
+        self.load_spectrum(x, y, timestamp=0)
+
+    def load_spectrum(self, x, y, timestamp):
+        super().load_spectrum(x, y, timestamp)
+
+
+def test_correct_baseline_zero_trace():
+    spectrum = DummySpectrum(np.arange(100, dtype=float), np.zeros(100))
+    spectrum.correct_baseline()
+    assert np.allclose(spectrum.baseline, 0)
+    assert np.allclose(spectrum.y, 0)
+
+
+def test_correct_baseline_linear_trace():
+    x = np.arange(100, dtype=float)
+    spectrum = DummySpectrum(x, 0.5 * x + 3)
+    spectrum.correct_baseline()
+    assert np.all(np.isfinite(spectrum.y))
+    assert np.allclose(spectrum.y, 0, atol=1e-6)
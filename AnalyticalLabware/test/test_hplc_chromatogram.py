@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+
+from AnalyticalLabware.devices.Agilent import chromatogram
+from AnalyticalLabware.devices.Agilent.chromatogram import AgilentHPLCChromatogram
+
+
+class FakeCHFile:
+    """Reads a constant trace from a text file instead of a Chemstation file."""
+
+    def __init__(self, filepath):
+        with open(filepath) as file:
+            value = float(file.read())
+        self.times = np.arange(10.0)
+        self.values = np.full(10, value)
+
+
+@pytest.fixture
+def run_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(chromatogram, "CHFile", FakeCHFile)
+    path = tmp_path / "run_2021-01-01-10-00.D"
+    path.mkdir()
+    for channel in "ABCDE":
+        (path / f"DAD1{channel}.ch").write_text("1")
+    return path
+
+
+@pytest.fixture
+def extracted(monkeypatch):
+    """Records the channels read from disk."""
+    calls = []
+    extract_rawdata = AgilentHPLCChromatogram.extract_rawdata
+
+    def recording(self, experiment_dir, channel):
+        calls.append(channel)
+        return extract_rawdata(self, experiment_dir, channel)
+
+    monkeypatch.setattr(AgilentHPLCChromatogram, "extract_rawdata", recording)
+    return calls
+
+
+def test_loaded_data_is_reused(run_dir, tmp_path, extracted):
+    spectrum = AgilentHPLCChromatogram(path=str(tmp_path / "hplc_data"))
+
+    spectrum.load_spectrum(str(run_dir), "A")
+    # processing works in place, the cached data must not change
+    spectrum.y -= 1
+    spectrum.load_spectrum(str(run_dir), "A")
+
+    assert extracted == ["A"]
+    np.testing.assert_array_equal(spectrum.y, 1)
+    assert spectrum.timestamp == pytest.approx(
+        chromatogram.time.mktime((2021, 1, 1, 10, 0, 0, 0, 0, -1))
+    )
+
+
+def test_cache_is_bounded(run_dir, tmp_path, extracted):
+    spectrum = AgilentHPLCChromatogram(path=str(tmp_path / "hplc_data"))
+
+    for channel in "ABCDE":
+        spectrum.load_spectrum(str(run_dir), channel)
+    assert len(spectrum._cache) == spectrum.CACHE_SIZE
+
+    # least recently loaded channel was dropped
+    spectrum.load_spectrum(str(run_dir), "E")
+    spectrum.load_spectrum(str(run_dir), "A")
+    assert extracted == ["A", "B", "C", "D", "E", "A"]
+
+
+def test_modified_channel_is_reloaded(run_dir, tmp_path, extracted):
+    spectrum = AgilentHPLCChromatogram(path=str(tmp_path / "hplc_data"))
+    spectrum.load_spectrum(str(run_dir), "A")
+
+    ch_file = run_dir / "DAD1A.ch"
+    ch_file.write_text("7")
+    # newer than the NPZ file written by the first load
+    mtime = os.path.getmtime(run_dir / "DAD1A.npz") + 10
+    os.utime(ch_file, (mtime, mtime))
+    spectrum.load_spectrum(str(run_dir), "A")
+
+    assert extracted == ["A", "A"]
+    np.testing.assert_array_equal(spectrum.y, 7)
@@ -0,0 +1,265 @@
+import asyncio
+import codecs
+import os
+import re
+import threading
+import time
+
+import pytest
+
+from AnalyticalLabware.devices.Agilent.hplc import (
+    GET_STATUS_CMD,
+    LAMP_ON_CMD,
+    RESET_COUNTER_CMD,
+    AsyncHPLCController,
+    HPLCController,
+)
+
+
+class FakeChemstation(threading.Thread):
+    """Runs the command loop of the hplctalk.mac macro on the given folder.
+
+    Commands are executed in memory: status and method queries, LoadMethod
+    and the counter reset are understood, anything else replies with the
+    last response, as the macro does.
+    """
+
+    def __init__(self, comm_dir):
+        super().__init__(daemon=True)
+        self.cmd_file = os.path.join(comm_dir, "cmd")
+        self.reply_file = os.path.join(comm_dir, "reply")
+        self.status = "STANDBY"
+        self.method = "DEFAULT.M"
+        # LoadMethod of these methods raises an error
+        self.failing_methods = set()
+        # every statement executed, in order
+        self.executed = []
+        self.last_cmd_no = 0
+        self.response = ""
+        self._stopped = threading.Event()
+
+        # overwrites the files when started
+        self._write(self.cmd_file, "0 Sleep 1\n", "w")
+        self._write(self.reply_file, "", "w")
+
+    @staticmethod
+    def _write(path, text, mode):
+        with open(path, mode, encoding="utf_16") as file:
+            file.write(text)
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def run(self):
+        while not self._stopped.wait(0.005):
+            try:
+                with open(self.cmd_file, "rb") as file:
+                    raw = file.read()
+            except OSError:
+                continue
+            if raw[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+                text = raw.decode("utf_16")
+            else:
+                text = raw.decode("utf8", errors="ignore")
+            cmd_no, _, cmd = text.strip().partition(" ")
+            try:
+                cmd_no = int(cmd_no)
+            except ValueError:
+                continue
+            if cmd_no <= self.last_cmd_no:
+                continue
+            self.last_cmd_no = cmd_no
+
+            self._write(self.reply_file, f"{cmd_no} ACK\n", "w")
+            if self._evaluate(cmd):
+                self._write(self.reply_file, f"{cmd_no} {self.response}\n", "a")
+            else:
+                self._write(
+                    self.reply_file,
+                    f"ERROR: {cmd_no} {cmd} caused Error # 1\n",
+                    "a",
+                )
+            self._write(self.reply_file, f"{cmd_no} DONE\n", "a")
+
+    def _evaluate(self, cmd):
+        """Executes the statements, returns False on error."""
+        for statement in cmd.split("; "):
+            self.executed.append(statement)
+            load = re.fullmatch(r'LoadMethod "(.*)", "(.*)"', statement)
+            if statement == "last_cmd_no = 0":
+                self.last_cmd_no = 0
+            elif statement == "response$ = AcqStatus$":
+                self.response = self.status
+            elif statement == "response$ = _MethFile$":
+                self.response = self.method
+            elif load is not None:
+                if load[2] in self.failing_methods:
+                    return False
+                self.method = load[2]
+        return True
+
+
+@pytest.fixture
+def chemstation(tmp_path):
+    macro = FakeChemstation(str(tmp_path))
+    macro.start()
+    yield macro
+    macro.stop()
+
+
+@pytest.fixture
+def controller(chemstation, tmp_path):
+    with HPLCController(str(tmp_path), data_dir=str(tmp_path)) as controller:
+        yield controller
+
+
+def test_send(controller):
+    controller.send('Print "Hé"')
+
+    with open(controller.cmd_file, "rb") as cmd_file:
+        assert cmd_file.read() == '1 Print "Hé"'.encode("utf8")
+
+
+def test_receive(controller, chemstation):
+    controller.send('Print "Hi"')
+
+    assert controller.receive() == "1 ACK\n1 \n1 DONE\n"
+    assert chemstation.executed[-1] == 'Print "Hi"'
+
+
+def test_close(controller):
+    with controller:
+        future = controller.send_batch_async(['Print "Hi"'])
+
+    # pending batches are finished before the files are closed
+    assert future.result() == "1 ACK\n1 \n1 DONE\n"
+    assert controller._cmd_fh.closed and controller._reply_fh.closed
+    with pytest.raises(RuntimeError):
+        controller.send_batch_async(['Print "Hi"'])
+
+
+def test_status_is_reused(chemstation, tmp_path):
+    controller = HPLCController(str(tmp_path), data_dir=str(tmp_path), status_ttl=60)
+
+    assert controller.status() == ["STANDBY"]
+    chemstation.status = "RUN"
+    assert controller.status() == ["STANDBY"]
+    assert chemstation.executed.count(GET_STATUS_CMD) == 1
+
+    # any other command may change the status
+    controller.lamp_on()
+    assert controller.status() == ["RUN"]
+    assert chemstation.executed.count(GET_STATUS_CMD) == 2
+
+
+def test_status_expires(chemstation, tmp_path):
+    controller = HPLCController(str(tmp_path), data_dir=str(tmp_path), status_ttl=0)
+
+    assert controller.status() == ["STANDBY"]
+    chemstation.status = "RUN"
+    assert controller.status() == ["RUN"]
+
+
+def test_status_after_pipelined_command(chemstation, tmp_path):
+    controller = HPLCController(
+        str(tmp_path), data_dir=str(tmp_path), status_ttl=60, pipelined=True
+    )
+
+    assert controller.status() == ["STANDBY"]
+    chemstation.status = "RUN"
+    controller.lamp_on()
+
+    # the queued command is executed before the status is queried again
+    assert controller.status() == ["RUN"]
+    assert chemstation.executed[-2:] == [LAMP_ON_CMD, GET_STATUS_CMD]
+
+
+def test_counter_reset_skipped_after_macro_start(controller, chemstation):
+    # the macro has just rewritten the command file with command #0
+    assert RESET_COUNTER_CMD not in chemstation.executed
+    assert controller.cmd_no == 0
+
+
+def test_counter_reset(controller, chemstation, tmp_path):
+    controller.send('Print "Hi"')
+    controller.receive()
+
+    second = HPLCController(str(tmp_path), data_dir=str(tmp_path))
+    assert chemstation.executed.count(RESET_COUNTER_CMD) == 1
+    assert second.cmd_no == 0
+
+    # the last command executed was the reset
+    HPLCController(str(tmp_path), data_dir=str(tmp_path))
+    assert chemstation.executed.count(RESET_COUNTER_CMD) == 1
+
+
+def test_pipelined(chemstation, tmp_path):
+    controller = HPLCController(str(tmp_path), data_dir=str(tmp_path), pipelined=True)
+    cmds = [f"Print {i}" for i in range(5)]
+
+    for cmd in cmds:
+        controller.send(cmd)
+    controller.flush()
+
+    # every command is executed, in order
+    assert chemstation.executed == cmds
+    assert controller.receive() == "5 ACK\n5 \n5 DONE\n"
+
+
+def test_switch_method(controller, chemstation):
+    controller.switch_method("NEW")
+
+    assert chemstation.method == "NEW.M"
+    assert chemstation.executed.count('LoadMethod "", "NEW.M"') == 1
+
+
+def test_switch_method_reloads_after_error(controller, chemstation):
+    chemstation.failing_methods.add("NEW.M")
+
+    with pytest.raises(RuntimeError):
+        controller.switch_method("NEW", num_attempts=3)
+    # loading is retried, the query is never reached
+    assert chemstation.executed.count('LoadMethod "", "NEW.M"') == 3
+    assert chemstation.method == "DEFAULT.M"
+
+
+def test_switch_method_needs_an_attempt(controller, chemstation):
+    with pytest.raises(ValueError):
+        controller.switch_method("NEW", num_attempts=0)
+    assert chemstation.executed == []
+
+
+def test_receive_from_replaced_reply_file(tmp_path):
+    # the macro has just been started, but does not reply
+    FakeChemstation(str(tmp_path))
+    controller = HPLCController(str(tmp_path), data_dir=str(tmp_path), timeout=1)
+    controller.send('Print "Hi"')
+
+    # reply written to a new file, which then replaces the reply file
+    new_reply = tmp_path / "reply.new"
+    new_reply.write_text("1 ACK\n1 \n1 DONE\n", encoding="utf_16")
+    os.replace(new_reply, controller.reply_file)
+
+    assert controller.receive() == "1 ACK\n1 \n1 DONE\n"
+
+
+def test_async_controller(chemstation, tmp_path):
+    async def main():
+        hplc = AsyncHPLCController(str(tmp_path), data_dir=str(tmp_path))
+        try:
+            assert await hplc.status() == ["STANDBY"]
+            await hplc.switch_method("NEW")
+        finally:
+            await hplc.close()
+        return hplc
+
+    hplc = asyncio.run(main())
+
+    assert chemstation.method == "NEW.M"
+    # attributes are passed through, even callable ones
+    assert hplc.data_files is hplc.controller.data_files
+    assert hplc.spectra is hplc.controller.spectra
+    assert hplc.logger is hplc.controller.logger
+    hplc.controller.on_done = print
+    assert hplc.on_done is print
@@ -0,0 +1,75 @@
+import codecs
+
+import pytest
+
+from AnalyticalLabware.devices.Agilent.hplc import Reply, _parse_reply_no
+
+
+def utf16(text, byteorder=None):
+    """Encodes the text as written by the macro, with BOM by default."""
+    if byteorder == "be":
+        return codecs.BOM_UTF16_BE + text.encode("utf_16_be")
+    if byteorder == "le":
+        return codecs.BOM_UTF16_LE + text.encode("utf_16_le")
+    # no BOM
+    return text.encode("utf_16_le")
+
+
+@pytest.mark.parametrize("byteorder", ["le", "be", None])
+def test_parse_reply_no_bom(byteorder):
+    assert _parse_reply_no(utf16("5 ACK\n", byteorder)) == 5
+
+
+@pytest.mark.parametrize("cmd_no", [1, 42, 255, 256])
+def test_parse_reply_no_multi_digit(cmd_no):
+    assert _parse_reply_no(utf16(f"{cmd_no} ACK\n", "le")) == cmd_no
+    assert _parse_reply_no(utf16(f"{cmd_no} ACK\n", "be")) == cmd_no
+
+
+def test_parse_reply_no_leading_whitespace():
+    assert _parse_reply_no(utf16(" \r\n12 ACK\n", "le")) == 12
+
+
+def test_parse_reply_no_truncated_header():
+    # header cut in the middle of a code unit after the number
+    assert _parse_reply_no(utf16("123 ACK\n", "le")[:9]) == 123
+
+
+@pytest.mark.parametrize("text", ["", "ACK\n", "Error 12\n", " \n"])
+def test_parse_reply_no_malformed(text):
+    with pytest.raises(ValueError, match="Malformed response"):
+        _parse_reply_no(utf16(text, "le"))
+
+
+def test_parse_reply_no_non_ascii_digits():
+    # fullwidth digits share the low byte with ASCII digits
+    with pytest.raises(ValueError):
+        _parse_reply_no(utf16("１２ ACK\n", "le"))
+
+
+@pytest.mark.parametrize("byteorder", ["le", "be"])
+def test_reply_ack_only_not_done(byteorder):
+    reply = Reply(utf16("12 ACK\n", byteorder))
+    assert not reply.is_done()
+
+
+@pytest.mark.parametrize("byteorder", ["le", "be"])
+def test_reply_done(byteorder):
+    reply = Reply(utf16("12 ACK\n12 RUN\n12 DONE\n", byteorder))
+    assert reply.is_done()
+    assert reply.text.splitlines()[1] == "12 RUN"
+
+
+def test_reply_partially_written():
+    raw = utf16("12 ACK\n12 DONE\n", "le")
+    # odd number of bytes, the last code unit is incomplete
+    assert Reply(raw[:-1]).is_done()
+    # DONE line not written completely
+    assert not Reply(raw[:-6]).is_done()
+
+
+def test_reply_done_after_long_response():
+    # only the tail is decoded, long responses are still recognised
+    response = "\n".join(f"12 line {i}" for i in range(100))
+    reply = Reply(utf16(f"12 ACK\n{response}\n12 DONE\n", "le"))
+    assert reply.is_done()
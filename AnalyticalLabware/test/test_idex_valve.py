@@ -0,0 +1,137 @@
+import inspect
+import logging
+import time
+
+import pytest
+
+from SerialLabware.serial_labware import SerialDevice
+
+from AnalyticalLabware.devices.IDEX.mxii_valve_sl1 import (
+    IDEXMXIIValve,
+    _SharedScheduler,
+)
+
+
+class FakeValve(IDEXMXIIValve):
+    """Valve answering from memory instead of the serial connection.
+
+    The undecorated methods are called, as the connection is never opened.
+    """
+
+    def __init__(self, position=1):
+        super().__init__("valve")
+        self.logger = logging.getLogger("FakeValve")
+        self.position = position
+        self.sent = []
+        self.fail_moves = False
+
+    def send_message(self, message, get_return=False):
+        self.sent.append(message)
+        if message == self.cmd["READ_STATUS"]:
+            return f"{self.position}\r"
+        if self.fail_moves:
+            raise IOError("No reply from the valve")
+        self.position = int(message[1:3])
+        return ""
+
+    @property
+    def status(self):
+        return inspect.unwrap(IDEXMXIIValve.status.fget)(self)
+
+    def move_to_position(self, position):
+        return inspect.unwrap(IDEXMXIIValve.move_to_position)(self, position)
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def valve(monkeypatch):
+    monkeypatch.setattr(SerialDevice, "__init__", lambda self, *args, **kwargs: None)
+    return FakeValve()
+
+
+def test_known_position_is_not_queried(valve):
+    valve.move_to_position(2)
+    valve.move_to_position(2)
+    valve.move_to_position(1)
+
+    assert valve.sent == ["S00\r", "P02\r", "P01\r"]
+    assert valve.position == 1
+
+
+def test_failed_move_forgets_position(valve):
+    valve.move_to_position(1)
+    valve.fail_moves = True
+    with pytest.raises(IOError):
+        valve.move_to_position(2)
+
+    # valve is queried again before the next move
+    valve.fail_moves = False
+    valve.move_to_position(2)
+    assert valve.sent == ["S00\r", "P02\r", "S00\r", "P02\r"]
+
+
+def test_scheduler_runs_calls_in_order():
+    scheduler = _SharedScheduler()
+    calls = []
+
+    scheduler.enter(0.1, calls.append, ("late",))
+    thread = scheduler._thread
+    # queued later, but due first
+    scheduler.enter(0.01, calls.append, ("early",))
+    thread.join(2)
+
+    assert calls == ["early", "late"]
+    # pending calls are not dropped at exit, the thread ends once idle
+    assert not thread.daemon
+    assert scheduler._thread is None
+
+
+def test_scheduler_survives_failed_call(caplog):
+    scheduler = _SharedScheduler()
+    calls = []
+
+    scheduler.enter(0.01, lambda: 1 / 0)
+    thread = scheduler._thread
+    scheduler.enter(0.05, calls.append, ("next",))
+    thread.join(2)
+
+    assert calls == ["next"]
+    assert "Scheduled call failed" in caplog.text
+
+
+def test_sample_returns_home(valve):
+    valve.move_to_position(1)
+    valve.sample(0.05)
+
+    assert valve.position == 2
+    wait_for(lambda: valve.position == 1)
+
+
+def test_stale_position_is_queried(valve, monkeypatch):
+    valve.move_to_position(2)
+    # valve moved from the front panel
+    valve.position = 1
+
+    # last position is trusted for POSITION_TTL
+    valve.move_to_position(2)
+    assert valve.sent == ["S00\r", "P02\r"]
+
+    monkeypatch.setattr(valve, "POSITION_TTL", -1)
+    valve.move_to_position(2)
+    assert valve.sent == ["S00\r", "P02\r", "S00\r", "P02\r"]
+    assert valve.position == 2
+
+
+def test_error_status_forgets_position(valve):
+    valve.move_to_position(2)
+    valve.position = 66
+
+    with pytest.raises(Exception, match="Valve positioning error"):
+        valve.current_position
+    assert valve._last_position is None
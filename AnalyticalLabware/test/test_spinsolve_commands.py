@@ -0,0 +1,180 @@
+import os
+import xml.etree.ElementTree as ET
+from io import BytesIO
+
+import pytest
+
+from AnalyticalLabware.devices.Magritek.Spinsolve.commands import (
+    ProtocolCommands,
+    RequestCommands,
+    load_commands_from_device,
+)
+from AnalyticalLabware.devices.Magritek.Spinsolve.utils.constants import (
+    SAMPLE_TAG,
+    SOLVENT_TAG,
+    USER_DATA_TAG,
+)
+
+# folder with the ProtocolOptions.xml file
+PROTOCOL_OPTIONS_DIR = os.path.join(
+    os.path.dirname(__file__),
+    os.pardir,
+    "devices",
+    "Magritek",
+    "Docs",
+)
+
+# values that need escaping in attributes and text
+SPECIAL = 'a&b <c> "d"\te\nf\rg'
+
+CUSTOM_PROTOCOLS = """<?xml version="1.0" encoding="utf-8"?>
+<ProtocolOptions>
+  <Protocol protocol="FREE">
+    <Option name="Any"/>
+    <Option name="Also"/>
+  </Protocol>
+  <Protocol protocol="NO OPTIONS"/>
+</ProtocolOptions>
+"""
+
+
+def et_message(build):
+    """Renders the message with ElementTree, as the commands were built before."""
+    msg_root = ET.Element("Message")
+    build(msg_root)
+    msg = BytesIO()
+    ET.ElementTree(msg_root).write(msg, encoding="utf-8", xml_declaration=True)
+    return msg.getvalue()
+
+
+def et_command(protocol, options, custom_tag="Start"):
+    def build(msg_root):
+        command = ET.SubElement(msg_root, custom_tag, {"protocol": f"{protocol}"})
+        for key, value in options.items():
+            ET.SubElement(command, "Option", {"name": f"{key}", "value": f"{value}"})
+
+    return et_message(build)
+
+
+def et_request(tag, options=None):
+    def build(msg_root):
+        element = ET.SubElement(msg_root, f"{tag}")
+        if options is not None and USER_DATA_TAG in options:
+            options.pop(USER_DATA_TAG)
+            user_data = ET.SubElement(element, USER_DATA_TAG)
+            for key, value in options.items():
+                ET.SubElement(user_data, "Data", {"key": f"{key}", "value": f"{value}"})
+        elif options is not None:
+            for key, value in options.items():
+                ET.SubElement(element, f"{key}").text = value
+
+    return et_message(build)
+
+
+@pytest.fixture(scope="module")
+def commands():
+    return ProtocolCommands(PROTOCOL_OPTIONS_DIR)
+
+
+@pytest.fixture
+def custom_commands(tmp_path):
+    path = tmp_path / "ProtocolOptions.xml"
+    path.write_text(CUSTOM_PROTOCOLS, encoding="utf-8")
+    return ProtocolCommands(str(tmp_path))
+
+
+@pytest.fixture
+def requests():
+    return RequestCommands()
+
+
+@pytest.mark.parametrize(
+    "protocol, options",
+    [
+        ("1D PROTON", {"Scan": "QuickScan"}),
+        ("1D PROTON", {}),
+        ("1D EXTENDED+", {"Number": 16}),
+    ],
+)
+def test_generate_command(commands, protocol, options):
+    expected = et_command(protocol, options)
+    assert commands.generate_command((protocol, options)) == expected
+
+
+def test_generate_command_custom_tag(commands):
+    expected = et_command("1D PROTON", {}, custom_tag="EstimateDurationRequest")
+    msg = commands.generate_command(
+        ("1D PROTON", {}), custom_tag="EstimateDurationRequest"
+    )
+    assert msg == expected
+
+
+def test_generate_command_escaping(custom_commands):
+    options = {"Any": SPECIAL, "Also": 1.5}
+    expected = et_command("FREE", options)
+    assert custom_commands.generate_command(("FREE", options)) == expected
+    expected = et_command("NO OPTIONS", {})
+    assert custom_commands.generate_command(("NO OPTIONS", {})) == expected
+
+
+@pytest.mark.parametrize("option", ["QuickShim1", "PowerShim"])
+def test_shim_on_sample(commands, option):
+    expected = et_command("SHIM 1H SAMPLE", {"SampleReference": "7.26", "Shim": option})
+    assert commands.shim_on_sample(7.264, option) == expected
+
+
+@pytest.mark.parametrize(
+    "method, tag",
+    [
+        ("request_hardware", "HardwareRequest"),
+        ("request_available_protocol_options", "AvailableProtocolOptionsRequest"),
+        ("abort", "Abort"),
+    ],
+)
+def test_constant_requests(requests, method, tag):
+    assert getattr(requests, method)() == et_request(tag)
+
+
+@pytest.mark.parametrize(
+    "option", ["CheckShimRequest", "QuickShimRequest", "PowerShimRequest"]
+)
+def test_request_shim(requests, option):
+    assert requests.request_shim(option) == et_request(option)
+
+
+@pytest.mark.parametrize("tag", [USER_DATA_TAG, SOLVENT_TAG, SAMPLE_TAG])
+def test_get_requests(requests, tag):
+    method = {
+        USER_DATA_TAG: requests.get_user_data,
+        SOLVENT_TAG: requests.get_solvent,
+        SAMPLE_TAG: requests.get_sample,
+    }[tag]
+    assert method() == et_request("GetRequest", {tag: ""})
+
+
+def test_set_requests(requests):
+    expected = et_request("Set", {SOLVENT_TAG: SPECIAL})
+    assert requests.set_solvent_data(SPECIAL) == expected
+    expected = et_request("Set", {SAMPLE_TAG: SPECIAL})
+    assert requests.set_sample_data(SPECIAL) == expected
+    expected = et_request("DataFolder", {"TimeStamp": SPECIAL})
+    assert requests.set_data_folder(SPECIAL, "TimeStamp") == expected
+
+
+def test_set_user_data(requests):
+    user_data = {"reaction": SPECIAL, "step": 2}
+    expected = et_request("Set", dict(user_data, **{USER_DATA_TAG: ""}))
+    assert requests.set_user_data(user_data) == expected
+
+
+def test_load_commands_from_device():
+    message = CUSTOM_PROTOCOLS.encode("utf-8")
+
+    protocols = load_commands_from_device(message)
+    assert list(protocols) == ["FREE", "NO OPTIONS"]
+    assert [option.get("name") for option in protocols["FREE"].iter("Option")] == [
+        "Any",
+        "Also",
+    ]
+    # str messages are accepted as well
+    assert list(load_commands_from_device(message.decode("utf-8"))) == list(protocols)
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from AnalyticalLabware.devices.Magritek.Spinsolve.spectrum import (
+    ACQUISITION_PARAMETERS,
+    FID_DATA,
+    SpinsolveNMRSpectrum,
+)
+
+ACQU_PAR = """\
+bandwidth           = 5
+lowestFrequency     = -2500
+b1Freq              = 43.6
+nrPnts              = 8
+rxChannel           = "1H"
+CurrentTime         = "2021-03-04T10:11:12.123"
+Sample              = "a = b"
+Solvent             = ""
+shimCurrents        = [1.5, -2, 3e-2]
+userData            = "reaction=R1;step=2"
+"""
+
+
+def write_data(path, x, y, trailing=b""):
+    """Writes the spectrum file: 32 byte header, X axis, (re, im) pairs of Y."""
+    header = np.arange(8, dtype="<i4").tobytes()
+    pairs = np.column_stack([y.real, y.imag]).astype("<f4")
+    with open(path, "wb") as fileobj:
+        fileobj.write(header + x.astype("<f4").tobytes() + pairs.tobytes() + trailing)
+
+
+@pytest.fixture
+def spectrum(tmp_path):
+    return SpinsolveNMRSpectrum(path=str(tmp_path / "nmr_data"))
+
+
+def test_extract_parameters(spectrum, tmp_path):
+    params_path = tmp_path / ACQUISITION_PARAMETERS
+    params_path.write_text(ACQU_PAR)
+
+    params = spectrum.extract_parameters(str(params_path))
+
+    assert params == {
+        "bandwidth": 5.0,
+        "lowestFrequency": -2500.0,
+        "b1Freq": 43.6,
+        "nrPnts": 8.0,
+        "rxChannel": "1H",
+        "CurrentTime": "2021-03-04T10:11:12.123",
+        "Sample": "a = b",
+        "Solvent": "",
+        "shimCurrents": "[1.5, -2, 3e-2]",
+        "userData": {"reaction": "R1", "step": "2"},
+    }
+
+
+def test_extract_parameters_line_endings(spectrum, tmp_path):
+    params_path = tmp_path / ACQUISITION_PARAMETERS
+    params_path.write_bytes(b'nrPnts = 8\r\nrxChannel = "19F"')
+
+    params = spectrum.extract_parameters(str(params_path))
+
+    assert params == {"nrPnts": 8.0, "rxChannel": "19F"}
+
+
+def test_read_data(tmp_path):
+    x = np.linspace(-1, 1, 8)
+    y = np.arange(8) + 1j * np.arange(8, 16)
+    data_path = tmp_path / FID_DATA
+    # incomplete trailing float is ignored
+    write_data(data_path, x, y, trailing=b"\x00\x00")
+
+    x_axis, y_data = SpinsolveNMRSpectrum._read_data(str(data_path))
+
+    assert x_axis.dtype == np.dtype("<f4")
+    np.testing.assert_array_equal(x_axis, x.astype("<f4"))
+    assert y_data.shape == (8, 2)
+    # complex view shares the buffer with the (re, im) pairs
+    complex_data = y_data.view("<c8").ravel()
+    assert np.shares_memory(complex_data, y_data)
+    np.testing.assert_array_equal(complex_data, y.astype("<c8"))
+
+
+@pytest.mark.parametrize("extra_floats", [1, 2])
+def test_read_data_truncated_point(tmp_path, extra_floats):
+    x = np.linspace(-1, 1, 8)
+    y = np.arange(8) + 1j * np.arange(8, 16)
+    data_path = tmp_path / FID_DATA
+    # part of the next point, e.g. the file is still being written
+    write_data(data_path, x, y, trailing=b"\x00" * 4 * extra_floats)
+
+    x_axis, y_data = SpinsolveNMRSpectrum._read_data(str(data_path))
+
+    assert x_axis.size == 8
+    assert y_data.shape == (8, 2)
+    np.testing.assert_array_equal(y_data.view("<c8").ravel(), y.astype("<c8"))
+
+
+def test_read_data_header_only(tmp_path):
+    data_path = tmp_path / FID_DATA
+    data_path.write_bytes(b"\x00" * 20)
+
+    x_axis, y_data = SpinsolveNMRSpectrum._read_data(str(data_path))
+
+    assert x_axis.size == 0
+    assert y_data.shape == (0, 2)
+
+
+def test_extract_data(spectrum, tmp_path):
+    x = np.linspace(-1, 1, 8)
+    y = np.arange(8) - 1j * np.arange(8)
+    data_path = tmp_path / FID_DATA
+    write_data(data_path, x, y)
+
+    x_axis, real, imag = spectrum.extract_data(str(data_path))
+
+    np.testing.assert_array_equal(x_axis, x.astype("<f4"))
+    np.testing.assert_array_equal(real, y.real)
+    np.testing.assert_array_equal(imag, y.imag)
+
+
+def test_load_raw_fid(spectrum, tmp_path):
+    (tmp_path / ACQUISITION_PARAMETERS).write_text(ACQU_PAR)
+    x = np.arange(8) * 1e-3
+    y = np.exp(-np.arange(8) / 4) * np.exp(1j * np.arange(8))
+    write_data(tmp_path / FID_DATA, x, y)
+
+    spectrum.load_spectrum(str(tmp_path), preprocessed=False)
+
+    assert spectrum.y.dtype == np.dtype("<c8")
+    np.testing.assert_array_equal(spectrum.y, y.astype("<c8"))
+    assert spectrum.udic[0]["label"] == "1H"